@@ -0,0 +1,263 @@
+import math
+import os
+import queue
+import random
+import time
+
+import numpy as np
+import torch
+from torch import nn
+from torch.distributions import Categorical
+
+from ai.environment import STATION_FEATURES
+from ai.utils import process_context
+from engine import SimulationEngine
+from utils.constants import SIMULATION_TICK
+
+_engine = None  # Each planner worker process keeps one headless engine to restore snapshots into
+
+
+def unpack_bits(packed, count):
+    """Unpack little-endian bit arrays of shape (..., bytes) into (..., count) booleans."""
+    bits = packed[..., None] >> torch.arange(8, dtype=torch.uint8) & 1
+    return bits.flatten(-2)[..., :count].bool()
+
+
+class PolicyNetwork(nn.Module):
+    """
+    Actor-critic over VectorMiniMetroEnv observations.
+
+    The flat (line, a, b) action is factored into picking a line or the no-op,
+    then a first station, then a second one, so each world is scored over
+    lines + 2 * stations choices instead of every line * S * S pair. Stations
+    are embedded from their features and line membership; the second station's
+    logits are the first's query against every station's key for that line.
+    Choices outside the packed action mask are never sampled.
+    """
+
+    def __init__(self, num_lines, station_features=STATION_FEATURES, hidden=64, key_size=16):
+        super().__init__()
+        self.num_lines = num_lines
+        self.key_size = key_size
+        self.encoder = nn.Sequential(
+            nn.Linear(station_features + num_lines, hidden), nn.ReLU(),
+            nn.Linear(hidden, hidden), nn.ReLU(),
+        )
+        self.line = nn.Linear(hidden, num_lines + 1)  # The last choice is the no-op
+        self.first = nn.Linear(hidden, num_lines)
+        self.query = nn.Linear(hidden, num_lines * key_size)
+        self.key = nn.Linear(hidden, num_lines * key_size)
+        self.value = nn.Sequential(nn.Linear(hidden, hidden), nn.ReLU(), nn.Linear(hidden, 1))
+
+    def forward(self, stations, lines, action_mask, actions=None):
+        """
+        Sample flat actions for a batch of observations, or score the given ones.
+        Returns (actions, log probabilities, entropies, state values).
+        """
+        batch, count = stations.shape[:2]
+        rows = torch.arange(batch)
+        active = stations[..., 2] > 0
+        starts = (action_mask != 0).any(dim=3)  # (batch, line, a): a has some partner on the line
+        hidden = self.encoder(torch.cat([stations, lines.transpose(1, 2)], dim=2))
+        pooled = (hidden * active[..., None]).sum(1) / active.sum(1, keepdim=True).clamp(min=1)
+        if actions is not None:
+            line, rest = actions.div(count * count, rounding_mode="floor"), actions % (count * count)
+            first, second = rest.div(count, rounding_mode="floor"), rest % count
+
+        open_lines = torch.cat([starts.any(dim=2), torch.ones(batch, 1, dtype=torch.bool)], dim=1)
+        line_distribution = Categorical(logits=self.line(pooled).masked_fill(~open_lines, -1e9))
+        if actions is None:
+            line = line_distribution.sample()
+        chosen = line.clamp(max=self.num_lines - 1)  # No-op rows score some line; their stations are ignored
+
+        first_logits = self.first(hidden)[rows, :, chosen].masked_fill(~starts[rows, chosen], -1e9)
+        first_distribution = Categorical(logits=first_logits)
+        if actions is None:
+            first = first_distribution.sample()
+
+        query = self.query(hidden[rows, first]).view(batch, self.num_lines, self.key_size)[rows, chosen]
+        key = self.key(hidden).view(batch, count, self.num_lines, self.key_size)[rows, :, chosen]
+        second_logits = (key @ query[:, :, None]).squeeze(2) / self.key_size ** 0.5
+        second_logits = second_logits.masked_fill(~unpack_bits(action_mask[rows, chosen, first], count), -1e9)
+        second_distribution = Categorical(logits=second_logits)
+        if actions is None:
+            second = second_distribution.sample()
+            actions = torch.where(line == self.num_lines, self.num_lines * count * count,
+                                  (chosen * count + first) * count + second)
+
+        move = (line < self.num_lines).float()
+        log_prob = line_distribution.log_prob(line) + move * (
+            first_distribution.log_prob(first) + second_distribution.log_prob(second))
+        entropy = line_distribution.entropy() + move * (first_distribution.entropy() + second_distribution.entropy())
+        return actions, log_prob, entropy, self.value(pooled).squeeze(1)
+
+
+def _rollout(session_seed, snapshot, move, rollout_seed, horizon_ticks, waiting_penalty):
+    """
+    Play one random future of a snapshot in a planner worker and return (value, seconds taken).
+    The value is passengers delivered within the horizon minus a penalty for those left waiting.
+    """
+    global _engine
+    started = time.perf_counter()
+    if _engine is None or _engine.session.seed != session_seed:
+        _engine = SimulationEngine(seed=session_seed)  # Same seed, same map
+    engine = _engine
+    engine.restore(snapshot)
+    engine.rng.seed(rollout_seed)  # Future spawns are unknown to the planner, so sample them
+    if move is not None:
+        line, a, b = move
+        engine.connect(engine.stations[a], engine.stations[b], engine.lines[line])
+    start_score = engine.score
+    for _ in range(horizon_ticks):
+        engine.update()
+    waiting = int(engine.world.waiting[:engine.world.station_count].sum())
+    return engine.score - start_score - waiting_penalty * waiting, time.perf_counter() - started
+
+
+class LookaheadPlanner:
+    """
+    Monte Carlo planner over line-building moves.
+
+    Candidate moves are scored by restoring an engine snapshot in a pool of
+    headless worker engines, applying the move and simulating horizon seconds
+    of random future. Rollouts are handed out UCB1-style, so the promising
+    moves get most of the time budget, and the best mean wins if it beats
+    doing nothing.
+    """
+
+    def __init__(self, workers=None, budget=0.5, horizon=30.0, waiting_penalty=0.5, exploration=1.0,
+                 neighbours=4, seed=None):
+        self.workers = workers or os.cpu_count()
+        self.budget = budget  # Wall seconds per decision
+        self.horizon = horizon  # Game seconds simulated per rollout
+        self.waiting_penalty = waiting_penalty
+        self.exploration = exploration
+        self.neighbours = neighbours  # Nearest stations considered for each new connection
+        self._random = random.Random(seed)
+        # Workers start before any display or thread exists; they only ever import the headless engine
+        self.pool = process_context().Pool(self.workers)
+        self._unfinished = []  # Rollouts the last search stopped waiting for
+        self.rollouts = 0
+        self.search_time = 0.0
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def candidates(self, engine):
+        """
+        Moves worth trying as (line, station, station) index triples.
+        A line in use is only extended from its last station, and only the first
+        empty line is opened, since the empty lines are interchangeable.
+        """
+        count = len(engine.stations)
+        if count < 2:
+            return []
+        xy = np.stack([engine.world.station_x[:count], engine.world.station_y[:count]], axis=1).astype(np.float64)
+        distance = np.hypot(*(xy[:, None] - xy[None]).transpose(2, 0, 1))
+        np.fill_diagonal(distance, np.inf)
+
+        moves = []
+        opened = False
+        for line in engine.lines:
+            if line.blocked:
+                continue
+            if not line.stations:
+                if opened:
+                    continue
+                opened = True
+                # Each station with its nearest neighbours, every pair once
+                nearest = np.argsort(distance, axis=1)[:, :self.neighbours]
+                pairs = {(min(a, b), max(a, b)) for a in range(count) for b in nearest[a].tolist()}
+                moves.extend((line.index, a, b) for a, b in sorted(pairs))
+            else:
+                last = line.stations[-1].index
+                members = [station.index for station in line.stations]
+                row = distance[last].copy()
+                row[members] = np.inf
+                for b in np.argsort(row)[:self.neighbours].tolist():
+                    if row[b] < np.inf:
+                        moves.append((line.index, last, b))
+        return moves
+
+    def search(self, snapshot, session_seed, moves):
+        """
+        Spend the time budget on rollouts of moves and of doing nothing.
+        No rollout is queued that would not finish in time, and the search returns
+        at the deadline. Rollouts still queued or running then are waited for at the
+        start of the next search, before its budget starts, so it never queues behind them.
+        Returns (best move or None, report) where report holds the rollout count,
+        rollouts per second, the chosen option's mean value and the seconds spent
+        draining the previous search's rollouts.
+        """
+        drain_start = time.perf_counter()
+        for result in self._unfinished:
+            result.wait()
+        self._unfinished = []
+        drained = time.perf_counter() - drain_start
+
+        options = [None] + list(moves)
+        counts = np.zeros(len(options))
+        totals = np.zeros(len(options))
+        in_flight = np.zeros(len(options))
+        horizon_ticks = round(self.horizon / SIMULATION_TICK)
+        results = queue.SimpleQueue()
+        start = time.perf_counter()
+        deadline = start + self.budget
+        pending = 0
+        submitted = []
+        rollout_time = 0.0  # Mean worker seconds per rollout, once one has come back
+        while True:
+            # Keep every worker busy with a couple of queued rollouts while they can still finish in time
+            while (pending < 2 * self.workers
+                   and time.perf_counter() + rollout_time * (pending // self.workers + 1) < deadline):
+                index = self._pick(counts + in_flight, totals, counts)
+                submitted.append(self.pool.apply_async(
+                    _rollout, (session_seed, snapshot, options[index], self._random.getrandbits(32), horizon_ticks,
+                               self.waiting_penalty),
+                    callback=lambda value, index=index: results.put((index, value, None)),
+                    error_callback=lambda error, index=index: results.put((index, None, error))))
+                in_flight[index] += 1
+                pending += 1
+            remaining = deadline - time.perf_counter()
+            if pending == 0 or remaining <= 0:
+                break
+            try:
+                index, value, error = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if error is not None:
+                raise error
+            value, seconds = value
+            pending -= 1
+            in_flight[index] -= 1
+            counts[index] += 1
+            totals[index] += value
+            rollout_time += (seconds - rollout_time) / counts.sum()
+
+        elapsed = time.perf_counter() - start
+        self._unfinished = [result for result in submitted if not result.ready()]
+        rollouts = int(counts.sum())
+        self.rollouts += rollouts
+        self.search_time += elapsed
+        means = np.where(counts > 0, totals / np.maximum(counts, 1), -np.inf)
+        best = int(np.argmax(means))
+        if means[best] <= means[0]:
+            best = 0  # A move has to beat doing nothing
+        report = {"rollouts": rollouts, "rollouts_per_second": rollouts / elapsed, "value": float(means[best]),
+                  "options": len(options), "drained": drained}
+        return options[best], report
+
+    def plan(self, engine):
+        """Pick a move for the engine's current state, blocking for the time budget."""
+        return self.search(engine.snapshot(), engine.session.seed, self.candidates(engine))
+
+    def _pick(self, visits, totals, counts):
+        """UCB1 over the options, counting rollouts still in flight as visits."""
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return int(unvisited[0])
+        means = np.where(counts > 0, totals / np.maximum(counts, 1), 0.0)
+        scale = max(np.abs(means).max(), 1.0)  # Values are passenger counts, so explore on their scale
+        bonus = self.exploration * scale * np.sqrt(math.log(visits.sum()) / visits)
+        return int(np.argmax(means + bonus))
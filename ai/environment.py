@@ -0,0 +1,277 @@
+import random
+
+import gym
+import numpy as np
+from gym import spaces
+
+from models.stations import Station
+from models.world import WorldState
+from utils.constants import GRID_SIZE, HEIGHT, LINE_COLORS, MAP_PACK_PATH, PASSENGER_SPAWN_INTERVAL, SAVE_PATH, SHAPES, SIDEBAR_WIDTH, STATION_SPAWN_INTERVAL, WIDTH
+from utils.helpers import load_all_maps
+from utils.map_pack import build_river_polygon, current_map_pack
+from utils.placement import PlacementMask
+from utils.profiler import NULL_PROFILER
+
+STATION_FEATURES = 3 + 2 * len(SHAPES)  # x, y, active, shape one-hot, waiting per destination shape
+
+
+# Action masks are packed bit arrays of shape (..., lines, stations, bytes), where bit b of
+# row (line, a) is set when connecting a to b on that line would change the line.
+# Bits are little-endian within each byte, as np.packbits(bitorder="little") lays them out.
+
+def connection_mask(active, member):
+    """
+    Build packed masks from scratch for worlds with the given live stations (worlds, S)
+    and line membership (worlds, lines, S). Two distinct live stations can be connected
+    unless both are already on the line.
+    """
+    count = active.shape[-1]
+    live = active[:, None, :, None] & active[:, None, None, :] & ~np.eye(count, dtype=bool)
+    valid = live & ~(member[..., :, None] & member[..., None, :])
+    return np.packbits(valid, axis=-1, bitorder="little")
+
+
+def open_stations(mask, active, worlds, stations):
+    """
+    Update masks for stations[i] that just became live in worlds[i]; they are on no line yet.
+    Only the new stations' rows and their bit in every live row are touched.
+    """
+    byte, bit = stations >> 3, np.left_shift(1, stations & 7).astype(np.uint8)
+    # A world can open several stations at once, so the same byte may be hit repeatedly
+    np.bitwise_or.at(mask, (worlds, slice(None), slice(None), byte), bit[:, None, None] * active[worlds][:, None, :])
+    rows = np.packbits(active[worlds], axis=-1, bitorder="little")
+    rows[np.arange(len(stations)), byte] &= ~bit
+    mask[worlds, :, stations] = rows[:, None]
+
+
+def join_line(mask, member, worlds, lines, stations):
+    """
+    Update masks after stations[i] joined lines[i] in worlds[i]; member must already include them.
+    Each (world, line) pair may appear only once per call.
+    """
+    byte, bit = stations >> 3, np.left_shift(1, stations & 7).astype(np.uint8)
+    mask[worlds, lines, stations] &= ~np.packbits(member[worlds, lines], axis=-1, bitorder="little")
+    mask[worlds, lines, :, byte] &= ~(bit[:, None] * member[worlds, lines])
+
+
+class VectorMiniMetroEnv(gym.vector.VectorEnv):
+    """
+    N MiniMetro worlds stepped in lockstep on stacked NumPy arrays.
+
+    Every world has room for max_stations stations and len(LINE_COLORS) lines,
+    each served by one train. One env step is step_seconds of game time in
+    which every train moves one stop, turning around at either end of its line
+    like the engine's trains.
+
+    Actions are flat indices into (line, station, station); the last index is a no-op.
+    Connecting two stations appends whichever of them is not on the line yet,
+    like TrainLine.add_connection. The reward is the number of passengers delivered.
+    Observations carry a packed action_mask of the connections that would change a line.
+
+    This is an intentionally simplified model of the game, not a copy of the engine:
+    trains hop one stop per step however far apart the stops are, and a passenger
+    boards any train whose line serves their destination shape, with no routing
+    and no transfers. Observations share the engine's layout (see ObservationEncoder),
+    but a policy trained here learns these dynamics, not the engine's.
+    """
+
+    def __init__(self, num_envs, max_stations=32, capacity=6, step_seconds=1.0, max_waiting=20, max_steps=1000,
+                 save_path=SAVE_PATH, pack_path=MAP_PACK_PATH, seed=None, profiler=None):
+        self.max_stations = max_stations
+        self.num_lines = len(LINE_COLORS)
+        self.capacity = capacity
+        self.step_seconds = step_seconds
+        self.max_waiting = max_waiting  # A station holding more passengers ends the episode
+        self.max_steps = max_steps
+        self.noop_action = self.num_lines * max_stations * max_stations
+
+        observation_space = spaces.Dict({
+            "stations": spaces.Box(0.0, np.inf, (max_stations, STATION_FEATURES), np.float32),
+            "lines": spaces.Box(0.0, 1.0, (self.num_lines, max_stations), np.float32),
+            "action_mask": spaces.Box(0, 255, (self.num_lines, max_stations, (max_stations + 7) // 8), np.uint8),
+        })
+        super().__init__(num_envs, observation_space, spaces.Discrete(self.noop_action + 1))
+
+        # Maps are loaded once; each keeps its placement masks and only resets them
+        pack = current_map_pack(pack_path, save_path, GRID_SIZE)
+        if pack is not None:
+            maps = [pack.load(index)[1:] for index in range(len(pack))]
+        else:
+            maps = [(build_river_polygon(map_data), None) for map_data in load_all_maps(save_path)]
+        self.maps = []
+        for river_polygon, distance_raster in maps:
+            initial_mask = Station.initial_placement_mask(river_polygon, WIDTH, HEIGHT, GRID_SIZE, SIDEBAR_WIDTH,
+                                                          distance_raster)
+            placement = PlacementMask(river_polygon, distance_raster=distance_raster)
+            self.maps.append((river_polygon, placement, initial_mask))
+
+        self._random = random.Random(seed)
+        self._np_random = np.random.default_rng(seed)
+        self._actions = None
+        self.profiler = profiler or NULL_PROFILER  # Times the phases of each step
+
+        n, s, l, k = num_envs, max_stations, self.num_lines, len(SHAPES)
+        # Static per episode
+        self.station_xy = np.zeros((n, s, 2), dtype=np.float32)
+        self.station_shape = np.zeros((n, s), dtype=np.int64)
+        self.station_count = np.zeros(n, dtype=np.int64)  # Positions sampled for the episode
+        # Dynamic
+        self.time = np.zeros(n, dtype=np.float64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.active_count = np.zeros(n, dtype=np.int64)  # Stations spawned so far
+        self.spawn_timer = np.zeros((n, s), dtype=np.float64)
+        self.waiting = np.zeros((n, s, k), dtype=np.int64)
+        self.line_order = np.full((n, l, s), -1, dtype=np.int64)
+        self.line_length = np.zeros((n, l), dtype=np.int64)
+        self.line_member = np.zeros((n, l, s), dtype=bool)
+        self.line_shapes = np.zeros((n, l, k), dtype=bool)  # Destination shapes each line serves
+        self.train_stop = np.zeros((n, l), dtype=np.int64)  # Index into line_order
+        self.train_direction = np.ones((n, l), dtype=np.int64)  # +1 towards the last stop, -1 back
+        self.train_load = np.zeros((n, l, k), dtype=np.int64)
+        self.action_mask = np.zeros((n, l, s, (s + 7) // 8), dtype=np.uint8)  # Kept up to date as worlds change
+
+    def _reset_worlds(self, worlds):
+        """Start a new episode in the given worlds."""
+        for world in worlds:
+            river_polygon, placement, initial_mask = self.maps[self._random.randrange(len(self.maps))]
+            placement.reset()
+            scratch = WorldState()
+            stations = Station.generate_initial_stations(river_polygon, WIDTH, HEIGHT, grid_size=GRID_SIZE,
+                                                         sidebar_width=SIDEBAR_WIDTH, placement_mask=placement,
+                                                         rng=self._random, initial_mask=initial_mask, world=scratch)
+            # Sample every later spawn up front so stepping never touches geometry
+            while len(stations) < self.max_stations:
+                station = Station.generate_new_station(placement, self._random, scratch)
+                if station is None:
+                    break
+                stations.append(station)
+
+            count = len(stations)
+            self.station_xy[world] = 0
+            self.station_xy[world, :count] = np.stack([scratch.station_x[:count], scratch.station_y[:count]], axis=1)
+            self.station_shape[world] = 0
+            self.station_shape[world, :count] = scratch.station_shape[:count]
+            self.station_count[world] = count
+            self.active_count[world] = min(count, 3)
+
+        self.time[worlds] = 0
+        self.steps[worlds] = 0
+        self.spawn_timer[worlds] = 0
+        self.waiting[worlds] = 0
+        self.line_order[worlds] = -1
+        self.line_length[worlds] = 0
+        self.line_member[worlds] = False
+        self.line_shapes[worlds] = False
+        self.train_stop[worlds] = 0
+        self.train_direction[worlds] = 1
+        self.train_load[worlds] = 0
+        active = np.arange(self.max_stations) < self.active_count[worlds, None]
+        self.action_mask[worlds] = connection_mask(active, self.line_member[worlds])
+
+    def _observe(self):
+        """Encode every world into the batched observation dict."""
+        active = np.arange(self.max_stations) < self.active_count[:, None]
+        stations = np.zeros((self.num_envs, self.max_stations, STATION_FEATURES), dtype=np.float32)
+        stations[..., 0] = self.station_xy[..., 0] / WIDTH
+        stations[..., 1] = self.station_xy[..., 1] / HEIGHT
+        stations[..., 2] = active
+        stations[..., 3:3 + len(SHAPES)] = np.eye(len(SHAPES), dtype=np.float32)[self.station_shape]
+        stations[..., 3 + len(SHAPES):] = self.waiting / self.max_waiting
+        stations *= active[..., None]
+        return {"stations": stations, "lines": self.line_member.astype(np.float32), "action_mask": self.action_mask.copy()}
+
+    def reset_wait(self, seed=None, options=None):
+        if seed is not None:
+            self._random.seed(seed)
+            self._np_random = np.random.default_rng(seed)
+        self._reset_worlds(np.arange(self.num_envs))
+        return self._observe(), {}
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64)
+
+    def _connect(self, actions):
+        """Apply line-building actions in every world at once."""
+        s = self.max_stations
+        line, rest = np.divmod(np.minimum(actions, self.noop_action - 1), s * s)
+        a, b = np.divmod(rest, s)
+        valid = (actions < self.noop_action) & (a != b) & (a < self.active_count) & (b < self.active_count)
+
+        worlds = np.flatnonzero(valid)
+        line, a, b = line[worlds], a[worlds], b[worlds]
+        for station in (a, b):
+            new = ~self.line_member[worlds, line, station]
+            w, l, st = worlds[new], line[new], station[new]
+            self.line_order[w, l, self.line_length[w, l]] = st
+            self.line_length[w, l] += 1
+            self.line_member[w, l, st] = True
+            self.line_shapes[w, l, self.station_shape[w, st]] = True
+            join_line(self.action_mask, self.line_member, w, l, st)
+
+    def _spawn(self):
+        """Spawn stations and passengers on the same timers as the object model."""
+        previous = np.arange(self.max_stations) < self.active_count[:, None]
+        self.active_count = np.minimum(self.station_count, 3 + (self.time // STATION_SPAWN_INTERVAL).astype(np.int64))
+        active = np.arange(self.max_stations) < self.active_count[:, None]
+        opened = np.nonzero(active & ~previous)
+        if len(opened[0]):
+            open_stations(self.action_mask, active, *opened)
+
+        due = active & (self.time[:, None] - self.spawn_timer >= PASSENGER_SPAWN_INTERVAL)
+        spawn = due & (self._np_random.random(due.shape) < 0.5)
+        # Destination is one of the other shapes
+        destination = (self.station_shape + self._np_random.integers(1, len(SHAPES), due.shape)) % len(SHAPES)
+        w, st = np.nonzero(spawn)
+        self.waiting[w, st, destination[w, st]] += 1
+        self.spawn_timer[w, st] = self.time[w]
+
+    def _move_trains(self):
+        """Advance every train one stop, dropping off and then picking up passengers."""
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        for line in range(self.num_lines):
+            length = self.line_length[:, line]
+            running = np.flatnonzero(length > 1)
+            if len(running) == 0:
+                continue
+            direction = self.train_direction[running, line]
+            stop = self.train_stop[running, line] + direction
+            self.train_stop[running, line] = stop
+            # Head back once the next stop would be past either end, as in the engine
+            turn = (stop + direction < 0) | (stop + direction >= length[running])
+            self.train_direction[running[turn], line] = -direction[turn]
+            station = self.line_order[running, line, stop]
+
+            # Drop off passengers whose destination matches the station
+            shape = self.station_shape[running, station]
+            rewards[running] += self.train_load[running, line, shape]
+            self.train_load[running, line, shape] = 0
+
+            # Board passengers bound for a shape on this line, lowest shape id first
+            free = self.capacity - self.train_load[running, line].sum(axis=1)
+            wanted = self.waiting[running, station] * self.line_shapes[running, line]
+            before = np.cumsum(wanted, axis=1) - wanted
+            taken = np.clip(np.minimum(wanted, free[:, None] - before), 0, None)
+            self.waiting[running, station] -= taken
+            self.train_load[running, line] += taken
+        return rewards
+
+    def step_wait(self):
+        profiler = self.profiler
+        with profiler.phase("connect"):
+            self._connect(self._actions)
+        self.time += self.step_seconds
+        self.steps += 1
+        with profiler.phase("spawn"):
+            self._spawn()
+        with profiler.phase("move_trains"):
+            rewards = self._move_trains()
+
+        terminated = (self.waiting.sum(axis=2) > self.max_waiting).any(axis=1)
+        truncated = ~terminated & (self.steps >= self.max_steps)
+        done = np.flatnonzero(terminated | truncated)
+        if len(done):
+            with profiler.phase("reset"):
+                self._reset_worlds(done)
+        with profiler.phase("observe"):
+            observation = self._observe()
+        return observation, rewards, terminated, truncated, {}
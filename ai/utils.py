@@ -0,0 +1,254 @@
+import multiprocessing
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ai.environment import STATION_FEATURES, VectorMiniMetroEnv, connection_mask, join_line, open_stations
+from utils.constants import HEIGHT, LINE_COLORS, SHAPES, WIDTH
+
+ALIGNMENT = 64
+RESET = -1  # Worker command to reset its environments; otherwise commands are rollout step indices
+
+
+class EngineListener:
+    """Base for objects that follow a SimulationEngine through its listeners list."""
+
+    engine = None
+
+    def attach(self, engine):
+        """Start following engine and catch up with its current state."""
+        self.engine = engine
+        engine.listeners.append(self)
+        self.reset(engine)
+        return self
+
+    def detach(self):
+        self.engine.listeners.remove(self)
+        self.engine = None
+
+    def reset(self, engine):
+        pass
+
+    def station_added(self, station):
+        pass
+
+    def stations_changed(self, indices):
+        pass
+
+    def line_changed(self, line):
+        pass
+
+
+class ObservationEncoder(EngineListener):
+    """
+    Fixed-size observation of a SimulationEngine, patched as the game changes.
+
+    Attached to an engine, the encoder is told which stations spawned, which
+    waiting counts changed and which lines were edited, and rewrites only those rows.
+    Station rows use the same features as VectorMiniMetroEnv, so a policy trained
+    there can be run on the engine, though the environment's train and passenger
+    rules are simpler. Stations beyond max_stations are left out.
+
+    stations: (max_stations, STATION_FEATURES) x, y, active, shape one-hot, waiting per destination shape
+    lines: (lines, max_stations) 1 where a station is on a line
+    globals: (2,) elapsed game seconds and score
+    """
+
+    def __init__(self, max_stations=128, num_lines=len(LINE_COLORS), max_waiting=20):
+        self.max_stations = max_stations
+        self.max_waiting = max_waiting  # Waiting counts are divided by this, as in the environment
+        self.stations = np.zeros((max_stations, STATION_FEATURES), dtype=np.float32)
+        self.lines = np.zeros((num_lines, max_stations), dtype=np.float32)
+        self.globals = np.zeros(2, dtype=np.float32)
+        self._tensors = None
+
+    def tensors(self):
+        """The encoded arrays as torch tensors sharing their memory, so they always show the latest state."""
+        if self._tensors is None:
+            import torch
+            self._tensors = tuple(torch.from_numpy(array) for array in (self.stations, self.lines, self.globals))
+        return self._tensors
+
+    def reset(self, engine):
+        self.stations[:] = 0
+        self.lines[:] = 0
+        for station in engine.stations:
+            self.station_added(station)
+        for line in engine.lines:
+            self.line_changed(line)
+        self._encode_globals()
+
+    def station_added(self, station):
+        index = station.index
+        if index >= self.max_stations:
+            return
+        row = self.stations[index]
+        row[0] = station.x / WIDTH
+        row[1] = station.y / HEIGHT
+        row[2] = 1
+        row[3:3 + len(SHAPES)] = 0
+        row[3 + station.shape_id] = 1
+        self._encode_waiting(index)
+
+    def stations_changed(self, indices):
+        for index in indices:
+            if index < self.max_stations:
+                self._encode_waiting(index)
+        self._encode_globals()
+
+    def line_changed(self, line):
+        row = self.lines[line.index]
+        row[:] = 0
+        for station in line.stations:
+            if station.index < self.max_stations:
+                row[station.index] = 1
+
+    def _encode_waiting(self, index):
+        self.stations[index, 3 + len(SHAPES):] = self.engine.world.waiting[index] / self.max_waiting
+
+    def _encode_globals(self):
+        self.globals[0] = self.engine.elapsed_time
+        self.globals[1] = self.engine.score
+
+
+class ActionMask(EngineListener):
+    """
+    Packed bit mask of the connections that would change a SimulationEngine's lines,
+    laid out like VectorMiniMetroEnv's action_mask observation for a single world.
+    A new station opens its row and column; a station joining a line closes its
+    pairs with the line's other stations. Nothing else is recomputed.
+    """
+
+    def __init__(self, max_stations=128, num_lines=len(LINE_COLORS)):
+        self.max_stations = max_stations
+        # Kept with a leading world axis of 1 to share the environment's mask updates
+        self.active = np.zeros((1, max_stations), dtype=bool)
+        self.member = np.zeros((1, num_lines, max_stations), dtype=bool)
+        self.bits = np.zeros((1, num_lines, max_stations, (max_stations + 7) // 8), dtype=np.uint8)
+        self._tensor = None
+
+    def tensor(self):
+        """The packed mask as a torch tensor sharing its memory."""
+        if self._tensor is None:
+            import torch
+            self._tensor = torch.from_numpy(self.bits[0])
+        return self._tensor
+
+    def allowed(self, line, a, b):
+        """Whether connecting station indices a and b on line index line would change the line."""
+        if max(a, b) >= self.max_stations:
+            return False
+        return bool(self.bits[0, line, a, b >> 3] >> (b & 7) & 1)
+
+    def reset(self, engine):
+        self.active[:] = False
+        self.active[0, :min(len(engine.stations), self.max_stations)] = True
+        self.member[:] = False
+        for line in engine.lines:
+            for station in line.stations:
+                if station.index < self.max_stations:
+                    self.member[0, line.index, station.index] = True
+        self.bits[:] = connection_mask(self.active, self.member)
+
+    def station_added(self, station):
+        if station.index < self.max_stations:
+            self.active[0, station.index] = True
+            open_stations(self.bits, self.active, np.zeros(1, dtype=np.int64), np.array([station.index]))
+
+    def line_changed(self, line):
+        for station in line.stations:
+            if station.index < self.max_stations and not self.member[0, line.index, station.index]:
+                self.member[0, line.index, station.index] = True
+                join_line(self.bits, self.member, np.zeros(1, dtype=np.int64), np.array([line.index]),
+                          np.array([station.index]))
+
+
+def process_context():
+    """
+    Multiprocessing context for worker processes: fork where the platform has it,
+    so workers start without re-importing torch, else the platform default (spawn on Windows).
+    """
+    return multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+
+
+class SharedArrays:
+    """
+    Named NumPy arrays laid out in one shared memory block.
+    The creating process passes `handle` to workers, which attach to the same
+    memory, so arrays are exchanged without pickling or copying.
+    """
+
+    def __init__(self, specs, name=None):
+        self.specs = {key: (tuple(shape), np.dtype(dtype).str) for key, (shape, dtype) in specs.items()}
+        offsets = {}
+        size = 0
+        for key, (shape, dtype) in self.specs.items():
+            offsets[key] = size
+            size += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // ALIGNMENT) * ALIGNMENT
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=max(size, 1))
+        self.arrays = {key: np.ndarray(shape, dtype, buffer=self.shm.buf, offset=offsets[key])
+                       for key, (shape, dtype) in self.specs.items()}
+        for key, array in self.arrays.items():
+            setattr(self, key, array)
+
+    @property
+    def handle(self):
+        """Picklable description another process can attach with."""
+        return self.shm.name, self.specs
+
+    @classmethod
+    def attach(cls, handle):
+        name, specs = handle
+        return cls(specs, name)
+
+    def close(self):
+        for key in self.arrays:
+            delattr(self, key)
+        self.arrays = {}  # Views must go before the mapping can be closed
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def rollout_buffer_specs(num_envs, rollout_steps, max_stations, num_lines):
+    """Shapes of the shared rollout buffers; observation slot t + 1 holds the result of step t."""
+    return {
+        "stations": ((rollout_steps + 1, num_envs, max_stations, STATION_FEATURES), np.float32),
+        "lines": ((rollout_steps + 1, num_envs, num_lines, max_stations), np.float32),
+        "action_mask": ((rollout_steps + 1, num_envs, num_lines, max_stations, (max_stations + 7) // 8), np.uint8),
+        "actions": ((rollout_steps, num_envs), np.int64),
+        "rewards": ((rollout_steps, num_envs), np.float32),
+        "dones": ((rollout_steps, num_envs), np.bool_),
+    }
+
+
+def rollout_worker(connection, handle, envs, env_kwargs, seed):
+    """
+    Step a VectorMiniMetroEnv for the slice `envs` of the shared rollout buffers.
+    Each command is a step index (or RESET); the reply is the seconds spent stepping.
+    """
+    buffers = SharedArrays.attach(handle)
+    env = VectorMiniMetroEnv(envs.stop - envs.start, seed=seed, **env_kwargs)
+    try:
+        while True:
+            command = connection.recv()
+            if command is None:
+                break
+            start = time.perf_counter()
+            if command == RESET:
+                observation, _ = env.reset(seed=seed)
+                slot = 0
+            else:
+                observation, reward, terminated, truncated, _ = env.step(buffers.actions[command, envs])
+                buffers.rewards[command, envs] = reward
+                buffers.dones[command, envs] = terminated | truncated
+                slot = command + 1
+            buffers.stations[slot, envs] = observation["stations"]
+            buffers.lines[slot, envs] = observation["lines"]
+            buffers.action_mask[slot, envs] = observation["action_mask"]
+            connection.send(time.perf_counter() - start)
+    finally:
+        env.close()
+        buffers.close()
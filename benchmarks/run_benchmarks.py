@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+# Drawing benchmarks render offscreen
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Runs from the repository root like the game; the game modules live in src/
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+import pygame
+from shapely.geometry import Polygon
+
+from engine import SimulationEngine
+from models.stations import Station
+from models.train_lines import calculate_simplified_path, offset_path
+from renderer import Renderer
+from utils.constants import HEIGHT, SCREEN_WIDTH, SHAPES, SIDEBAR_WIDTH, WIDTH
+from utils.game_logic import draw_grid_dots
+from utils.placement import PlacementMask
+
+BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+BENCHMARKS = []  # (name, factory); a factory returns (func, setup) with setup run untimed before every call
+
+
+def benchmark(name):
+    def register(factory):
+        BENCHMARKS.append((name, factory))
+        return factory
+    return register
+
+
+def run(func, setup=None, min_time=0.2, repeat=5):
+    """
+    Time func and return the median and best time per call in seconds.
+    Without a setup, calls are looped in batches sized to take about min_time / repeat.
+    With one, every call is timed on its own right after its setup.
+    """
+    if setup is not None:
+        samples = []
+        deadline = time.perf_counter() + min_time
+        while len(samples) < repeat or time.perf_counter() < deadline:
+            setup()
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples), min(samples), len(samples)
+
+    # Grow the batch until it is long enough to time reliably
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_time / repeat:
+            break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return statistics.median(samples), min(samples), number * repeat
+
+
+def build_engine(station_count, passengers_per_station, seed=0):
+    """
+    A seeded engine with station_count stations chained across the lines and
+    passengers_per_station passengers waiting at each. Stations go on free
+    placement cells first and anywhere on the map once those run out.
+    """
+    engine = SimulationEngine(seed=seed)
+    rng = random.Random(seed)
+    while len(engine.stations) < station_count:
+        station = Station.generate_new_station(engine.placement, rng=rng, world=engine.world)
+        if station is None:
+            station = Station(rng.randrange(WIDTH), rng.randrange(HEIGHT), rng.choice(SHAPES), engine.world)
+        engine.add_station(station)
+    engine.last_station_time = float("inf")  # Keep the station count fixed while timing
+
+    # Split the stations into one chain per line
+    chunk = -(-station_count // len(engine.lines))
+    for i, line in enumerate(engine.lines):
+        chain = engine.stations[i * chunk:(i + 1) * chunk + 1]
+        for a, b in zip(chain, chain[1:]):
+            engine.connect(a, b, line)
+
+    for station in engine.stations:
+        for _ in range(passengers_per_station):
+            station.add_passenger(rng.choice([s for s in range(len(SHAPES)) if s != station.shape_id]))
+    return engine
+
+
+@benchmark("simplified_path_short")
+def bench_simplified_path_short():
+    return lambda: calculate_simplified_path((100, 100), (130, 120)), None
+
+
+@benchmark("simplified_path_long")
+def bench_simplified_path_long():
+    return lambda: calculate_simplified_path((0, 0), (WIDTH, HEIGHT)), None
+
+
+@benchmark("offset_path_short")
+def bench_offset_path_short():
+    path = [(100, 100), (160, 100), (200, 140)]
+    return lambda: offset_path(path, 1), None
+
+
+@benchmark("offset_path_long")
+def bench_offset_path_long():
+    path = [(x * 4, 100 + (x % 2) * 30) for x in range(200)]
+    return lambda: offset_path(path, 1), None
+
+
+def bench_generate_new_station(station_count):
+    """Add one station to a mask already holding station_count, on a map large enough to fit them."""
+    side = int((station_count + 1) ** 0.5 * 100) + 200
+    rng = random.Random(0)
+    river = Polygon([(-20, -20), (-10, -20), (-10, -10)])  # Off the map, so only stations limit placement
+    mask = PlacementMask(river, side, side)
+    for _ in range(station_count):
+        Station.generate_new_station(mask, rng=rng)
+    state = (mask.valid.copy(), mask._cells.copy(), mask._slots.copy(), mask.count)
+
+    def setup():
+        mask.valid[:] = state[0]
+        mask._cells[:] = state[1]
+        mask._slots[:] = state[2]
+        mask.count = state[3]
+
+    return lambda: Station.generate_new_station(mask, rng=rng), setup
+
+
+for _count in (10, 50, 200):
+    benchmark(f"generate_new_station_{_count}")(lambda count=_count: bench_generate_new_station(count))
+
+
+@benchmark("draw_grid_dots")
+def bench_draw_grid_dots():
+    engine = SimulationEngine(seed=0)
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    return lambda: draw_grid_dots(surface, engine.placement), None
+
+
+def bench_frame(rebuild, station_count=12, passengers_per_station=4):
+    """One viewer frame of a mid-game engine, with or without rebuilding the cached layers."""
+    screen = pygame.display.set_mode((SCREEN_WIDTH, HEIGHT))
+    engine = build_engine(station_count, passengers_per_station)
+    for index, line in enumerate(engine.lines):
+        line.set_sidebar_position((WIDTH + SIDEBAR_WIDTH // 2, 110 + index * 40))
+    for _ in range(90):
+        engine.update()  # Get the trains moving
+    renderer = Renderer(screen)
+    play_button = pygame.Rect(0, 0, 50, 50)
+    restart_button = pygame.Rect(0, 0, 50, 50)
+    draw = lambda: renderer.draw(engine, True, play_button, restart_button)
+    draw()
+
+    def invalidate():
+        renderer._map_key = None
+
+    return draw, invalidate if rebuild else None
+
+
+@benchmark("frame")
+def bench_frame_cached():
+    return bench_frame(rebuild=False)
+
+
+@benchmark("frame_rebuild")
+def bench_frame_rebuild():
+    return bench_frame(rebuild=True)
+
+
+@benchmark("frame_busy")
+def bench_frame_busy():
+    return bench_frame(rebuild=False, station_count=60, passengers_per_station=12)
+
+
+def bench_engine_tick(station_count, passengers_per_station):
+    engine = build_engine(station_count, passengers_per_station)
+    return engine.update, None
+
+
+for _stations, _passengers in ((5, 2), (20, 5), (50, 10), (200, 20)):
+    benchmark(f"engine_tick_{_stations}st_{_passengers}p")(
+        lambda stations=_stations, passengers=_passengers: bench_engine_tick(stations, passengers))
+
+
+@benchmark("station_near_200")
+def bench_station_near():
+    engine = build_engine(200, 0)
+    rng = random.Random(1)
+    points = [(rng.randrange(WIDTH), rng.randrange(HEIGHT)) for _ in range(64)]
+    return lambda: [engine.station_near(point) for point in points], None
+
+
+@benchmark("snapshot_50")
+def bench_snapshot():
+    engine = build_engine(50, 10)
+    return engine.snapshot, None
+
+
+@benchmark("restore_50")
+def bench_restore():
+    engine = build_engine(50, 10)
+    snapshot = engine.snapshot()
+    return lambda: engine.restore(snapshot), None
+
+
+def compare(results, baseline, threshold):
+    """Print current vs baseline medians and return the names that got slower by more than threshold."""
+    regressions = []
+    print(f"{'benchmark':<32}{'baseline us':>14}{'current us':>14}{'ratio':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<32}{'-':>14}{result['median_us']:>14.2f}{'new':>8}")
+            continue
+        ratio = result["median_us"] / baseline[name]["median_us"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{name:<32}{baseline[name]['median_us']:>14.2f}{result['median_us']:>14.2f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the simulation and rendering hot paths.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds to spend timing each benchmark")
+    parser.add_argument("--save", nargs="?", const=BASELINE_PATH, help="Store the results as a baseline")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, help="Compare against a baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    results = {}
+    for name, factory in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        func, setup = factory()
+        median, best, calls = run(func, setup, args.min_time)
+        results[name] = {"median_us": median * 1e6, "min_us": best * 1e6, "calls": calls}
+        print(f"{name:<32}{median * 1e6:>12.2f} us  (min {best * 1e6:.2f} us, {calls} calls)")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "results": results}, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)["results"]
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
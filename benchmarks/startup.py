@@ -0,0 +1,53 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Start-up budgets in milliseconds for a fresh interpreter, including the interpreter itself.
+# Worker processes import these, so they must not pull in pygame.
+STARTUP_BUDGETS = {
+    "engine": ("import engine", 350),
+    "environment": ("import ai.environment", 450),
+    "map_generator": ("import maps.generate_maps", 350),
+}
+CHECK_HEADLESS = "import sys; assert 'pygame' not in sys.modules, 'pygame was imported'"
+
+
+def measure(statement, runs=5):
+    """Median wall time of a fresh interpreter running statement, in milliseconds."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT_DIR, os.path.join(ROOT_DIR, "src")]))
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", f"{statement}; {CHECK_HEADLESS}"], cwd=ROOT_DIR, env=env,
+                                capture_output=True, text=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.returncode:
+            raise RuntimeError(f"'{statement}' failed:\n{result.stderr}")
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure headless start-up time against its budget.")
+    parser.add_argument("--runs", type=int, default=5, help="Interpreter launches per module")
+    args = parser.parse_args()
+
+    baseline = measure("pass", args.runs)
+    print(f"{'interpreter':<16}{baseline:>9.1f} ms")
+    over_budget = []
+    for name, (statement, budget) in STARTUP_BUDGETS.items():
+        elapsed = measure(statement, args.runs)
+        status = "ok" if elapsed <= budget else "OVER BUDGET"
+        print(f"{name:<16}{elapsed:>9.1f} ms  (budget {budget} ms) {status}")
+        if elapsed > budget:
+            over_budget.append(name)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import argparse
+import os
+import sys
+import time
+
+# Game modules live in src/ and are imported as top-level packages
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from utils.constants import MAP_PACK_PATH, SAVE_PATH
+from utils.map_pack import compile_map_pack
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the saved JSON maps into one memory-mappable map pack.")
+    parser.add_argument("--maps", default=SAVE_PATH, help="Directory of JSON maps")
+    parser.add_argument("--out", default=MAP_PACK_PATH, help="Pack file to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    compile_map_pack(args.maps, args.out)
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Runs headless from the repository root: maps/ and the game modules in src/ must both be importable
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from maps.map_utils import generate_line, generate_river
+from utils.constants import HEIGHT, WIDTH
+from utils.map_pack import build_river_polygon, compile_map, write_map_pack
+
+CURVE_TYPES = ["linear", "parabolic", "sine", "cosine"]
+THICKNESS = {"start": 10, "middle": 30, "end": 15}
+# Scratch output, so benchmark runs never replace the pack the game loads (MAP_PACK_PATH)
+DEFAULT_OUT = os.path.join(tempfile.gettempdir(), "minimetro", "generated.pack")
+
+
+def generate_map(seed):
+    """
+    Generate and compile the map for one seed, the same way the interactive generator does.
+    Returns None when the seed gives an unusable river, e.g. a degenerate parabola or one split in two.
+    """
+    rng = random.Random(seed)
+    curve_type = rng.choice(CURVE_TYPES)
+    try:
+        with np.errstate(divide="ignore", invalid="ignore"):  # Degenerate curves are rejected below
+            path = generate_line(WIDTH, HEIGHT, offset=50, curve_type=curve_type, rng=rng)
+    except ZeroDivisionError:
+        return None  # Parabola through a vertical river
+    if not np.isfinite(path).all():
+        return None
+    river = generate_river(path, THICKNESS["start"], THICKNESS["middle"], THICKNESS["end"], verbose=False)
+    if river.is_empty or river.geom_type != "Polygon":
+        return None
+
+    map_data = {
+        "width": WIDTH,
+        "height": HEIGHT,
+        "river": {
+            "path": [(float(x), float(y)) for x, y in path],
+            "thickness": THICKNESS,
+            "curve_type": curve_type,
+        },
+    }
+    if build_river_polygon(map_data).geom_type != "Polygon":
+        return None  # The game draws the river as a single polygon
+    return seed, compile_map(map_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate maps for a range of seeds in parallel and write them into a map pack.")
+    parser.add_argument("--seed-start", type=int, default=0, help="First seed")
+    parser.add_argument("--count", type=int, default=1000, help="Number of seeds to try")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--chunksize", type=int, default=32, help="Seeds handed to a worker at a time")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="Pack file to write; use maps/generated.pack to play on these maps")
+    args = parser.parse_args()
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+
+    seeds = range(args.seed_start, args.seed_start + args.count)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = [result for result in pool.map(generate_map, seeds, chunksize=args.chunksize) if result]
+    generated = time.perf_counter() - start
+
+    names = [f"seed_{seed:07}" for seed, _ in results]
+    write_map_pack(args.out, names, [compiled for _, compiled in results])
+    total = time.perf_counter() - start
+
+    print(f"Generated {len(results)}/{args.count} maps with {args.workers} workers in {generated:.2f}s "
+          f"({len(results) / generated:.1f} maps/s), {total:.2f}s including the pack write")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,9 @@ from shapely.geometry import LineString
 
 from utils.constants import TRAIN_LINE_THICKNESS
 
-
-# Initialize Pygame
-pygame.init()
-
 # Screen settings
 WIDTH, HEIGHT = 800, 400
 BUTTON_WIDTH, BUTTON_HEIGHT = 100, 40
-screen = pygame.display.set_mode((WIDTH + BUTTON_WIDTH * 2, HEIGHT))  # Extra space for buttons
-pygame.display.set_caption("Map Generation with Save and Next")
 
 # Colors
 BEIGE = (245, 245, 220)  # Land
@@ -26,9 +20,6 @@ GREY = (200, 200, 200)  # Button hover background
 # Paths
 SAVE_PATH = "maps/generated"
 
-# Ensure the save directory exists
-os.makedirs(SAVE_PATH, exist_ok=True)
-
 # Functions for generating the river and its path (already provided)
 from maps.map_utils import generate_line, generate_river
 
@@ -61,8 +52,15 @@ def save_map(map_data):
 
 # Main function
 def main():
+    # Initialize Pygame; importing this module alone opens no window
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH + BUTTON_WIDTH * 2, HEIGHT))  # Extra space for buttons
+    pygame.display.set_caption("Map Generation with Save and Next")
     font = pygame.font.Font(None, 24)
 
+    # Ensure the save directory exists
+    os.makedirs(SAVE_PATH, exist_ok=True)
+
     # Button positions
     next_button = pygame.Rect(WIDTH, HEIGHT - BUTTON_HEIGHT, BUTTON_WIDTH, BUTTON_HEIGHT)
     save_button = pygame.Rect(WIDTH + BUTTON_WIDTH, HEIGHT - BUTTON_HEIGHT, BUTTON_WIDTH, BUTTON_HEIGHT)
@@ -0,0 +1,291 @@
+import math
+
+import numpy as np
+
+from models.stations import Station
+from models.train_lines import TrainLine
+from models.trains import Train
+from models.world import WorldState
+from utils.constants import GRID_SIZE, HEIGHT, LINE_COLORS, SIDEBAR_WIDTH, SIMULATION_TICK, SNAP_DISTANCE, STATION_SPAWN_INTERVAL, TRAIN_SPEED, WIDTH
+from utils.game_logic import initialize_game
+from utils.placement import PlacementMask
+from utils.profiler import NULL_PROFILER
+from utils.routing import Router
+from utils.session import CONNECT, SELECT_LINE, Session
+from utils.snapshot import SnapshotReader, SnapshotWriter
+from utils.spatial_hash import SpatialHash
+from utils.tracing import STATION_ADDED, STATION_SPAWN_FAILED, tracer
+
+
+class SimulationEngine:
+    """
+    Headless game state advanced in fixed logic ticks.
+    Owns the map, stations, lines, trains and passengers; rendering is left to a viewer.
+    """
+
+    def __init__(self, tick=SIMULATION_TICK, seed=None, recorder=None, profiler=None):
+        self.tick = tick  # Length of one logic step in seconds
+        self.generation = 0  # Counts resets so viewers can drop cached state
+        self.recorder = recorder  # Optional InputRecorder for player inputs
+        self.profiler = profiler or NULL_PROFILER  # Times the phases of each tick
+        self.listeners = []  # Told about every change to the game state, see reset() and update()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Load a random map and start a new game, seeded randomly unless a seed is given."""
+        self.generation += 1
+        self.session = Session(seed)
+        self.rng = self.session.rng
+        self.map_data, self.river_polygon, distance_raster = initialize_game(rng=self.rng)
+
+        # River and border checks run once per map
+        self.placement = PlacementMask(self.river_polygon, distance_raster=distance_raster)
+
+        # Station and passenger state lives in flat arrays; Station objects are views into it
+        self.world = WorldState(line_count=len(LINE_COLORS))
+        self.lines = [TrainLine(color, index) for index, color in enumerate(LINE_COLORS)]
+        self.trains = []
+
+        # Next-hop tables for passengers and a grid of stations for hit-testing, updated as stations spawn
+        self.router = Router()
+        self.station_index = SpatialHash()
+        self.stations = []
+        initial_stations = Station.generate_initial_stations(self.river_polygon, WIDTH, HEIGHT, grid_size=GRID_SIZE,
+                                                             sidebar_width=SIDEBAR_WIDTH, placement_mask=self.placement,
+                                                             rng=self.rng, world=self.world, distance_raster=distance_raster)
+        for station in initial_stations:
+            self.add_station(station)
+
+        # Clock variables
+        self.ticks = 0
+        self.elapsed_time = 0
+        self.last_station_time = 0
+        self._accumulator = 0
+
+        self.score = 0
+
+        if self.recorder:
+            self.recorder.start(self.session.seed, self.tick, self.map_data.get("name"))
+        for listener in self.listeners:
+            listener.reset(self)
+
+    @property
+    def passengers(self):
+        """All passengers currently waiting at a station."""
+        return [passenger for station in self.stations for passenger in station.passengers]
+
+    @property
+    def active_line(self):
+        """The line selected for building, if any."""
+        return next((line for line in self.lines if line.active), None)
+
+    def add_station(self, station):
+        """Register a station created in this engine's world."""
+        self.stations.append(station)
+        self.router.add_station(station.index, station.x, station.y, station.shape_id)
+        self.station_index.insert(station)
+        for listener in self.listeners:
+            listener.station_added(station)
+
+    def station_at(self, pos):
+        """Return the station under the given position, if any."""
+        return self.station_index.hit(pos, Station.radius)
+
+    def station_near(self, pos, snap_distance=SNAP_DISTANCE):
+        """Return the station under pos, or failing that the nearest one within snap_distance."""
+        return self.station_at(pos) or self.station_index.nearest(pos, snap_distance)
+
+    def select_line(self, line):
+        """Make line the one new connections are built on."""
+        for other_line in self.lines:
+            other_line.active = False
+        line.active = True
+        if self.recorder:
+            self.recorder.record(self.ticks, SELECT_LINE, line.index)
+
+    def connect(self, station1, station2, line=None):
+        """Connect two stations on the given line (the active line by default)."""
+        line = line or self.active_line
+        if line is None or station1 is station2:
+            return False
+
+        if self.recorder:
+            self.recorder.record(self.ticks, CONNECT, line.index, station1.index, station2.index)
+        line.add_connection(station1, station2)
+        self.router.sync_line(line.index, line.stations)
+
+        if len(line.stations) > 1:
+            # Stations are only ever appended, so trains already running keep valid positions
+            self.world.set_line_stops(line.index, line.path()[2])
+
+            # Every line gets a train as soon as it links two stations
+            if not line.trains:
+                train = Train(line, world=self.world)
+                line.trains.append(train)
+                self.trains.append(train)
+        for listener in self.listeners:
+            listener.line_changed(line)
+        return True
+
+    def _map_name(self):
+        return (self.map_data.get("name") or "").encode()
+
+    def snapshot(self):
+        """
+        Capture the game state in one flat byte string that restore() can return to.
+        Only what play changes is stored: stations, waiting counts, lines, trains, router tables,
+        placed-station cells, clocks and the random generator. The map itself is not, only its
+        name, so a snapshot can only be restored into an engine playing the same map.
+        """
+        writer = SnapshotWriter()
+        writer.write(np.frombuffer(self._map_name(), dtype=np.uint8))
+        version, words, gauss_next = self.rng.getstate()
+        active_line = self.active_line
+        writer.write(np.array([self.ticks, self.score, -1 if active_line is None else active_line.index, version]))
+        writer.write(np.array([self.elapsed_time, self.last_station_time, self._accumulator,
+                               math.nan if gauss_next is None else gauss_next]))
+        writer.write(np.array(words, dtype=np.uint32))
+        self.world.write_state(writer)
+        self.placement.write_state(writer)
+        self.router.write_state(writer)
+        writer.write(np.array([len(line.stations) for line in self.lines], dtype=np.int64))
+        writer.write(np.array([station.index for line in self.lines for station in line.stations], dtype=np.int64))
+        writer.write(np.array([train.capacity for train in self.trains], dtype=np.int64))
+        return writer.getvalue()
+
+    def restore(self, snapshot):
+        """
+        Return to the state captured by snapshot().
+        Arrays are copied into the existing ones and Station and Train views are reused,
+        so restoring is cheap enough to branch a game thousands of times.
+        Raises ValueError if the snapshot was taken on another map.
+        """
+        reader = SnapshotReader(snapshot)
+        map_name = reader.read(np.uint8).tobytes()
+        if map_name != self._map_name():
+            raise ValueError(f"Snapshot of map {map_name.decode()!r} cannot be restored on map "
+                             f"{self._map_name().decode()!r}")
+        self.ticks, self.score, active_line, version = reader.read(np.int64).tolist()
+        self.elapsed_time, self.last_station_time, self._accumulator, gauss_next = reader.read(np.float64).tolist()
+        self.rng.setstate((version, tuple(reader.read(np.uint32).tolist()), None if math.isnan(gauss_next) else gauss_next))
+        known = self.world.station_count
+        known_x, known_y = self.world.station_x[:known].copy(), self.world.station_y[:known].copy()
+        self.world.read_state(reader)
+        self.placement.read_state(reader)
+        self.router.read_state(reader)
+
+        # Another branch may have spawned a different station under the same index
+        count = self.world.station_count
+        shared = min(known, count)
+        moved = set(np.flatnonzero((self.world.station_x[:shared] != known_x[:shared])
+                                   | (self.world.station_y[:shared] != known_y[:shared])).tolist())
+        del self.stations[count:]
+        self.stations.extend(Station.view(self.world, index) for index in range(len(self.stations), count))
+        if moved or self.station_index.count != count:
+            self.station_index.clear()
+            for station in self.stations:
+                self.station_index.insert(station)
+
+        lengths = reader.read(np.int64).tolist()
+        members = reader.read(np.int64).tolist()
+        start = 0
+        for line, length in zip(self.lines, lengths):
+            stations = [self.stations[index] for index in members[start:start + length]]
+            start += length
+            if stations != line.stations or any(station.index in moved for station in stations):
+                line.stations = stations
+                line.invalidate_geometry()
+            line.active = line.index == active_line
+            line.trains = []
+
+        # Train rows are matched to lines again, since another branch may have built them in a different order
+        del self.trains[self.world.train_count:]
+        for index in range(len(self.trains), self.world.train_count):
+            self.trains.append(Train.view(self.world, index, None))
+        for train, capacity in zip(self.trains, reader.read(np.int64).tolist()):
+            train.line = self.lines[self.world.train_line[train.index]]
+            train.line.trains.append(train)
+            train.capacity = capacity
+
+        self.generation += 1
+        for listener in self.listeners:
+            listener.reset(self)
+
+    def step(self, dt):
+        """
+        Advance the simulation by dt seconds of game time.
+        Runs as many fixed ticks as fit and returns how many were run.
+        """
+        self._accumulator += dt
+        ticks = 0
+        while self._accumulator >= self.tick:
+            self._accumulator -= self.tick
+            self.update()
+            ticks += 1
+        return ticks
+
+    def update(self):
+        """Run a single fixed logic tick."""
+        self.ticks += 1
+        tracer.tick = self.ticks
+        self.elapsed_time = self.ticks * self.tick
+
+        profiler = self.profiler
+
+        # Add a new station every STATION_SPAWN_INTERVAL seconds
+        if self.elapsed_time - self.last_station_time >= STATION_SPAWN_INTERVAL:
+            with profiler.phase("spawn_station"):
+                new_station = Station.generate_new_station(self.placement, rng=self.rng, world=self.world)
+                if new_station:
+                    self.add_station(new_station)
+                    self.last_station_time = self.elapsed_time
+                    if tracer.info:
+                        tracer.emit(STATION_ADDED, new_station.index, new_station.x, new_station.y)
+                elif tracer.warning:
+                    tracer.emit(STATION_SPAWN_FAILED)
+
+        # Each station spawns passengers on its own timer
+        with profiler.phase("spawn_passengers"):
+            spawned = [station.index for station in self.stations if station.spawn_passenger(self.elapsed_time, self.rng)]
+
+        with profiler.phase("move_trains"):
+            stops = self.move_trains(self.tick)
+
+        # Only stations whose queues may have changed are reported
+        for listener in self.listeners:
+            listener.stations_changed(spawned + stops)
+
+    def move_trains(self, dt):
+        """
+        Move every train dt seconds along its line, all at once.
+        Trains run back and forth between the end stops and exchange passengers at each stop they reach.
+        Returns the indices of the stations where trains stopped.
+        """
+        world = self.world
+        count = world.train_count
+        if count == 0:
+            return []
+        distance = world.train_distance[:count]
+        direction = world.train_direction[:count]
+        target = world.train_target[:count]
+        line = world.train_line[:count]
+
+        goal = world.line_stops[line, target]
+        moved = distance + direction * TRAIN_SPEED * dt
+        arrived = direction * (moved - goal) >= 0
+        distance[:] = np.where(arrived, goal, moved)  # Trains stop exactly at the station
+
+        stops = []
+        for i in np.flatnonzero(arrived):
+            train = self.trains[i]
+            station = train.line.stations[target[i]]
+            self.score += train.drop_off_passengers(station, self.router)
+            train.pick_up_passengers(station, self.router)
+            stops.append(station.index)
+
+        # Head for the next stop, turning around at either end of the line
+        target[arrived] += direction[arrived]
+        turn = arrived & ((target < 0) | (target >= world.line_stop_count[line]))
+        direction[turn] *= -1
+        target[turn] += 2 * direction[turn]
+        return stops
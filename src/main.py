@@ -1,57 +1,45 @@
-import pygame
+import argparse
 import time
-from models.stations import Station
-from models.train_lines import TrainLine
-from utils.constants import BORDER_MARGIN, GRID_SIZE, PASSENGER_SPAWN_INTERVAL, STATION_SPAWN_INTERVAL, WIDTH, HEIGHT, SCREEN_WIDTH, BEIGE, SIDEBAR_WIDTH
-from utils.helpers import draw_passengers, load_random_map, draw_forbidden_area, draw_station, print_all_stations
-from utils.game_logic import draw_grid_dots, initialize_game
-from utils.sidebar import draw_sidebar, draw_temporary_line, handle_sidebar_click, handle_sidebar_events
-from models.passengers import Passenger
-
-# Initialize Pygame
-pygame.init()
-
-def main():
-    # Initialize screen
-    screen = pygame.display.set_mode((SCREEN_WIDTH, HEIGHT))
-    pygame.display.set_caption("MiniMetro Simulation")
+import pygame
+from engine import SimulationEngine
+from renderer import Renderer
+from utils.clock import SimulationClock
+from utils.constants import WIDTH, HEIGHT, SCREEN_WIDTH, SIDEBAR_WIDTH, TIME_SCALES
+from utils.profiler import FrameProfiler
+from utils.session import InputRecorder, parse_seed
+from utils.sidebar import handle_sidebar_click, handle_sidebar_events
+from utils.tracing import LEVEL_NAMES, tracer
+
+def set_sidebar_positions(lines):
+    """Place the line selectors in the sidebar."""
+    for index, line in enumerate(lines):
+        line.set_sidebar_position((WIDTH + SIDEBAR_WIDTH // 2, 110 + index * 40))
 
-    # Initialize game state
-    map_data, river_polygon = initialize_game()
 
-    # Precompute grid points
-    grid_points = [
-    (x, y)
-    for x in range(BORDER_MARGIN, WIDTH, GRID_SIZE)
-    for y in range(BORDER_MARGIN, HEIGHT, GRID_SIZE)
-]
+SPEED_KEYS = [pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4]  # Select TIME_SCALES directly
 
-    # Initialize stations
-    stations = Station.generate_initial_stations(river_polygon, WIDTH, HEIGHT, grid_size=GRID_SIZE, sidebar_width=SIDEBAR_WIDTH)
 
-    # Initialize train lines
-    lines = [
-        TrainLine((255, 0, 0)),  # Red line
-        TrainLine((0, 0, 255)),  # Blue line
-        TrainLine((255, 255, 0))  # Yellow line
-    ]
-    lines[0].set_sidebar_position((WIDTH + SIDEBAR_WIDTH // 2, 110))  # Green
-    lines[1].set_sidebar_position((WIDTH + SIDEBAR_WIDTH // 2, 150))  # Red
-    lines[2].set_sidebar_position((WIDTH + SIDEBAR_WIDTH // 2, 190))  # Yellow
+def main(seed=None, record_path=None, show_profiler=False, profile_path=None, speed=0):
+    # Initialize Pygame and the screen
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, HEIGHT))
+    pygame.display.set_caption("MiniMetro Simulation")
+
+    # Initialize game state
+    recorder = InputRecorder() if record_path else None
+    profiler = FrameProfiler()  # F3 toggles its overlay
+    engine = SimulationEngine(seed=seed, recorder=recorder, profiler=profiler)
+    print(f"Session seed: {engine.session.seed}")
+    set_sidebar_positions(engine.lines)
 
+    renderer = Renderer(screen, profiler=profiler)
+    renderer.show_profiler = show_profiler
 
-    passengers = []  # Store passengers
-    connections = []  # Store connections between stations (future implementation)
+    # Game time runs at a selectable multiple of the wall clock; Tab cycles, 1-4 pick a speed
+    clock = SimulationClock(engine, speed)
 
     # Clock variables
-    start_time = None
     running = False
-    elapsed_time = 0
-    last_station_time = 0
-    last_passenger_time = 0
-
-    # Score
-    score = 0  # Start score at zero
 
     # Sidebar buttons
     play_button = pygame.Rect(WIDTH + (SIDEBAR_WIDTH // 2) - 25, HEIGHT - 80, 50, 50)
@@ -63,99 +51,81 @@ def main():
 
     # Main loop
     while True:
-        current_time = time.time()
+        with profiler.phase("wait"):
+            frame_time = renderer.tick()  # Caps the frame rate
+        frame_start = time.perf_counter()
 
         # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                return
-            running, restart_pressed = handle_sidebar_events(event, play_button, restart_button, running)
-            if restart_pressed:
-                main()  # Restart the game
-            
-                        # Handle temporary line drawing
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left mouse button
-                handle_sidebar_click(lines, event.pos)
-                
-            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left mouse button
-                for station in stations:
-                    if station.contains(event.pos):  # Start drawing line
-                        temporary_line_start = station
-                        break
-
-            if event.type == pygame.MOUSEMOTION and temporary_line_start:
-                temporary_mouse_pos = event.pos  # Update mouse position for temporary line
-
-            if event.type == pygame.MOUSEBUTTONUP and event.button == 1:  # Left mouse button released
-                if temporary_line_start:
-                    for station in stations:
-                        if station.contains(event.pos) and station != temporary_line_start:  # Connect stations
-                            active_line = next((line for line in lines if line.active), None)
-                            if active_line:
-                                active_line.add_connection(temporary_line_start, station)
-                            break
-                    # Reset temporary line state
+        with profiler.phase("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    if recorder:
+                        recorder.save(record_path, engine.ticks)
+                    if profile_path:
+                        profiler.export(profile_path)
+                    tracer.stop()
+                    pygame.quit()
+                    return
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    renderer.show_profiler = not renderer.show_profiler
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                    clock.cycle_scale()
+                if event.type == pygame.KEYDOWN and event.key in SPEED_KEYS[:len(TIME_SCALES)]:
+                    clock.set_scale(SPEED_KEYS.index(event.key))
+                running, restart_pressed = handle_sidebar_events(event, play_button, restart_button, running)
+                if restart_pressed:
+                    # Restart the game; a recording keeps only the latest game
+                    if recorder:
+                        recorder.save(record_path, engine.ticks)
+                    engine.reset()
+                    print(f"Session seed: {engine.session.seed}")
+                    set_sidebar_positions(engine.lines)
+                    running = False
                     temporary_line_start = None
                     temporary_mouse_pos = None
-
-
-        # Game logic: Update elapsed time
+                    continue
+
+                # Handle temporary line drawing
+                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left mouse button
+                    line = handle_sidebar_click(engine.lines, event.pos)
+                    if line:
+                        engine.select_line(line)
+                    temporary_line_start = engine.station_at(event.pos)  # Start drawing line
+
+                if event.type == pygame.MOUSEMOTION and temporary_line_start:
+                    temporary_mouse_pos = event.pos  # Update mouse position for temporary line
+
+                if event.type == pygame.MOUSEBUTTONUP and event.button == 1:  # Left mouse button released
+                    if temporary_line_start:
+                        station = engine.station_near(event.pos)  # Snap to a station close to the release point
+                        if station:
+                            engine.connect(temporary_line_start, station)  # Connect stations
+                        # Reset temporary line state
+                        temporary_line_start = None
+                        temporary_mouse_pos = None
+
+        # Game logic runs only while the clock is playing
         if running:
-            if start_time is None:  # Start the clock on play
-                start_time = current_time
-            elapsed_time = current_time - start_time
-
-            # Add a new station every 10 seconds
-            if elapsed_time - last_station_time >= STATION_SPAWN_INTERVAL:
-                new_station = Station.generate_new_station(river_polygon, stations, grid_points)
-                if new_station:
-                    stations.append(new_station)
-                    last_station_time = elapsed_time
-                    print(f"New station added at ({new_station.x}, {new_station.y}) with shape: {new_station.shape}")
-                    print_all_stations(stations)
-                else:
-                    print("No space for new station.")
-            
-            # Spawn new passengers every 5 seconds
-            if elapsed_time - last_passenger_time >= PASSENGER_SPAWN_INTERVAL:
-                # Spawn passengers for each station
-                for station in stations:
-                    station.draw(screen)
-                    station.spawn_passenger(elapsed_time)
-
-        # Game area
-        screen.fill(BEIGE)  # Background color
-        draw_forbidden_area(screen, river_polygon, stations)  # Draw forbidden areas
-        for station in stations:
-            draw_station(screen, station)
-            draw_passengers(screen, station.passengers)
-
-        # Draw grid dots on top of everything
-        #draw_grid_dots(screen, river_polygon, stations, WIDTH, HEIGHT, grid_size=GRID_SIZE, sidebar_width=SIDEBAR_WIDTH)
-
-        # Draw train lines
-        for idx, line in enumerate(lines):
-            line.draw(screen, index=idx)
-
-
-        # Draw temporary line
-        if temporary_line_start and temporary_mouse_pos:
-            active_line = next((line for line in lines if line.active), None)
-            draw_temporary_line(screen, temporary_line_start, temporary_mouse_pos, active_line)
-
-
-        # Draw train lines
-        for index, line in enumerate(lines):
-            line.draw(screen, index=index)
-
-        # Sidebar
-        draw_sidebar(screen, elapsed_time, play_button, restart_button, running, score, lines)
-
-
-        # Refresh screen
-        pygame.display.flip()
+            with profiler.phase("simulation"):
+                clock.advance(frame_time)
 
+        # Draw the frame, unless the simulation needs the time to catch up
+        if not running or clock.should_render():
+            renderer.draw(engine, running, play_button, restart_button, temporary_line_start, temporary_mouse_pos,
+                          clock.label)
+        profiler.add("frame", time.perf_counter() - frame_start)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Play MiniMetro.")
+    parser.add_argument("--seed", type=parse_seed, help="Session seed, random by default")
+    parser.add_argument("--record", help="Save the player's inputs to this file for replay.py")
+    parser.add_argument("--trace", help="Write game events to this file, see utils/tracing.py")
+    parser.add_argument("--trace-level", choices=LEVEL_NAMES[:-1], default="info", help="Lowest event level to trace")
+    parser.add_argument("--speed", choices=["1", "4", "16", "max"], default="1", help="Initial time scale")
+    parser.add_argument("--profile", action="store_true", help="Show frame timings in the sidebar (toggle with F3)")
+    parser.add_argument("--profile-out", help="Export frame timings on exit, as JSON for a .json path and CSV otherwise")
+    args = parser.parse_args()
+    if args.trace:
+        tracer.start(args.trace, LEVEL_NAMES.index(args.trace_level))
+    speed = TIME_SCALES.index(None if args.speed == "max" else int(args.speed))
+    main(seed=args.seed, record_path=args.record, show_profiler=args.profile, profile_path=args.profile_out, speed=speed)
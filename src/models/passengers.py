@@ -1,21 +1,28 @@
-import pygame
-import random
-from shapely.geometry import Point
-
-from utils.constants import DARK_GREY
+from utils.constants import SHAPES
 
 class Passenger:
-    def __init__(self, station_position, shape, index):
-        self.position = self.calculate_position(station_position, index)
-        self.shape = shape  # "circle", "square", or "triangle"
+    """
+    Lightweight passenger record: a destination shape id and, when laid out for drawing, a screen position.
+    Stations and trains only count passengers per destination, so these are made on demand.
+    """
+
+    __slots__ = ("position", "shape_id")
+
+    def __init__(self, shape_id, position=None):
+        self.shape_id = shape_id  # Index into SHAPES
+        self.position = position
+
+    @property
+    def shape(self):
+        """Destination shape: "circle", "square", or "triangle"."""
+        return SHAPES[self.shape_id]
 
     @staticmethod
     def calculate_position(station_position, index):
-        """Calculate the passenger's position based on its index."""
+        """Screen position of the index-th passenger waiting at a station; works on NumPy arrays too."""
         base_x, base_y = station_position
         row = index // 4  # 4 passengers per row
         col = index % 4   # Column within the row
         offset_x = 20 + col * 20  # Offset passengers horizontally
         offset_y = row * 20       # Offset passengers vertically
         return (base_x + offset_x, base_y + offset_y)
-
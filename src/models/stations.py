@@ -1,125 +1,151 @@
 import random
-import pygame
-from shapely.geometry import Point
 
-from utils.helpers import draw_passengers
-from utils.constants import BLACK, FORBIDDEN_DISTANCE, PASSENGER_SPAWN_INTERVAL, RIVER_MARGIN, STATION_SIZE, WHITE
+from utils.placement import PlacementMask
+from utils.tracing import PASSENGER_SPAWNED, tracer
+from utils.constants import CIRCLE, FORBIDDEN_DISTANCE, PASSENGER_SPAWN_INTERVAL, SHAPES, SQUARE, TRIANGLE
 from models.passengers import Passenger
+from models.world import WorldState
 
 class Station:
-    def __init__(self, x, y, shape):
-        self.x = x
-        self.y = y
-        self.shape = shape  # Type of station (circle, square, triangle)
-        self.radius = 20
-        self.passengers = []  # List of passengers waiting at this station
-        self.spawn_timer = 0  # Time tracker for spawning passengers
-
-    def spawn_passenger(self, elapsed_time):
-        """Spawn a new passenger if the timer allows."""
-        if elapsed_time - self.spawn_timer >= PASSENGER_SPAWN_INTERVAL and random.random() < 0.5:
-            # Exclude the station's shape from possible passenger shapes
-            possible_shapes = [shape for shape in ["circle", "square", "triangle"] if shape != self.shape]
+    """View of one station row in a WorldState."""
+
+    __slots__ = ("world", "index")
+    radius = 20
 
-            # Randomly choose a passenger shape from the filtered list
-            passenger_shape = random.choice(possible_shapes)
+    def __init__(self, x, y, shape, world=None):
+        self.world = world if world is not None else WorldState()
+        self.index = self.world.add_station(x, y, SHAPES.index(shape))
+
+    @classmethod
+    def view(cls, world, index):
+        """Wrap an existing station row instead of adding one."""
+        station = cls.__new__(cls)
+        station.world = world
+        station.index = index
+        return station
+
+    @property
+    def x(self):
+        return int(self.world.station_x[self.index])
+
+    @property
+    def y(self):
+        return int(self.world.station_y[self.index])
+
+    @property
+    def shape_id(self):
+        return int(self.world.station_shape[self.index])
+
+    @property
+    def shape(self):
+        """Type of station (circle, square, triangle)."""
+        return SHAPES[self.world.station_shape[self.index]]
+
+    @property
+    def spawn_timer(self):
+        """Time tracker for spawning passengers."""
+        return self.world.spawn_timer[self.index]
+
+    @spawn_timer.setter
+    def spawn_timer(self, value):
+        self.world.spawn_timer[self.index] = value
+
+    @property
+    def passenger_count(self):
+        return int(self.world.waiting[self.index].sum())
+
+    @property
+    def passengers(self):
+        """Passengers waiting at this station grouped by destination, laid out where they are drawn now."""
+        position = (self.x, self.y)
+        return [Passenger(shape_id, Passenger.calculate_position(position, i))
+                for i, shape_id in enumerate(self.world.waiting_shapes(self.index).tolist())]
+
+    def add_passenger(self, shape_id):
+        """Add a passenger bound for shape_id."""
+        self.world.push_passenger(self.index, shape_id)
+
+    def spawn_passenger(self, elapsed_time, rng=random):
+        """Spawn a new passenger if the timer allows. Returns whether one was spawned."""
+        if elapsed_time - self.spawn_timer >= PASSENGER_SPAWN_INTERVAL and rng.random() < 0.5:
+            # Exclude the station's shape from possible passenger shapes
+            passenger_shape = (self.shape_id + rng.randrange(1, len(SHAPES))) % len(SHAPES)
 
             # Add the passenger to the station
-            self.passengers.append(Passenger((self.x, self.y), passenger_shape, len(self.passengers)))
+            self.add_passenger(passenger_shape)
             self.spawn_timer = elapsed_time
-            print(f"Passenger added to station at ({self.x}, {self.y}) with shape: {passenger_shape}")
+            if tracer.debug:
+                tracer.emit(PASSENGER_SPAWNED, self.index, passenger_shape)
+            return True
+        return False
 
     def print_station_details(self):
         """Print the station details including passengers."""
         passenger_shapes = [p.shape for p in self.passengers]
         print(f"Station: ({self.x}, {self.y}), Shape: {self.shape}, Passengers: {passenger_shapes}")
     
-    def draw(self, screen):
-        """Draw the station and its passengers."""
-        # Draw the station
-        half_size = STATION_SIZE // 2
-        if self.shape == "square":
-            pygame.draw.rect(screen, WHITE, (self.x - half_size, self.y - half_size, STATION_SIZE, STATION_SIZE))
-            pygame.draw.rect(screen, BLACK, (self.x - half_size, self.y - half_size, STATION_SIZE, STATION_SIZE), 3)
-        elif self.shape == "circle":
-            pygame.draw.circle(screen, WHITE, (self.x, self.y), half_size)
-            pygame.draw.circle(screen, BLACK, (self.x, self.y), half_size, 3)
-        elif self.shape == "triangle":
-            height = (STATION_SIZE * (3 ** 0.5)) / 2
-            points = [
-                (self.x, self.y - height // 2),
-                (self.x - half_size, self.y + height // 2),
-                (self.x + half_size, self.y + height // 2)
-            ]
-            pygame.draw.polygon(screen, WHITE, points)
-            pygame.draw.polygon(screen, BLACK, points, 3)
-
-        # Draw the passengers
-        draw_passengers(screen, self.passengers)
-
-
     @staticmethod
-    def generate_new_station(river_polygon, existing_stations, grid_points):
+    def generate_new_station(placement_mask, rng=random, world=None):
         """
-        Generate a new station using available grid points.
+        Generate a new station on a random free cell of the placement mask.
         """
-        valid_points = [
-            (x, y) for x, y in grid_points
-            if river_polygon.distance(Point(x, y)) > RIVER_MARGIN
-            and all(Point(x, y).distance(Point(s.x, s.y)) > FORBIDDEN_DISTANCE for s in existing_stations)
-        ]
-
-        if valid_points:
-            x, y = random.choice(valid_points)
-            shape = random.choice(["circle", "square", "triangle"])
-            grid_points.remove((x, y))  # Remove used point
-            return Station(x, y, shape)
-        
+        position = placement_mask.sample(rng)
+        if position:
+            x, y = position
+            shape = rng.choice(SHAPES)
+            placement_mask.occupy(x, y)  # Clear the forbidden area around it
+            return Station(x, y, shape, world)
+
         return None  # No valid points available
 
-    
+
     @classmethod
-    def generate_initial_stations(cls, river_polygon, width, height, grid_size=50, sidebar_width=200):
+    def generate_initial_stations(cls, river_polygon, width, height, grid_size=50, sidebar_width=200, placement_mask=None,
+                                  rng=random, initial_mask=None, world=None, distance_raster=None):
         """
-        Generate the first three stations using precomputed grid points.
+        Generate the first three stations away from the river and the map edges.
+        The stations are also registered in placement_mask when one is given.
+        initial_mask can be a mask from initial_placement_mask to reuse for the same map.
         """
-        # Precompute all possible points
-        playable_width = width - sidebar_width
-        grid_points = [
-            (x, y)
-            for x in range(FORBIDDEN_DISTANCE, playable_width, grid_size)
-            for y in range(FORBIDDEN_DISTANCE, height, grid_size)
-            if river_polygon.distance(Point(x, y)) > FORBIDDEN_DISTANCE
-        ]
+        # Stricter mask for the opening stations
+        if initial_mask is None:
+            initial_mask = cls.initial_placement_mask(river_polygon, width, height, grid_size, sidebar_width, distance_raster)
+        else:
+            initial_mask.reset()
 
         initial_stations = []
-        shapes = ["circle", "square", "triangle"]
-
-        for shape in shapes:
+        for shape in SHAPES:
             # Randomly pick a valid point
-            valid_points = [
-                (x, y) for x, y in grid_points
-                if all(Point(x, y).distance(Point(s.x, s.y)) > FORBIDDEN_DISTANCE for s in initial_stations)
-            ]
+            position = initial_mask.sample(rng)
 
-            if valid_points:
-                x, y = random.choice(valid_points)
-                initial_stations.append(cls(x, y, shape))
-                grid_points.remove((x, y))  # Remove used point
+            if position:
+                x, y = position
+                initial_stations.append(cls(x, y, shape, world))
+                initial_mask.occupy(x, y)
+                if placement_mask is not None:
+                    placement_mask.occupy(x, y)
 
         return initial_stations
     
+    @staticmethod
+    def initial_placement_mask(river_polygon, width, height, grid_size=50, sidebar_width=200, distance_raster=None):
+        """Build the placement mask used for the opening stations."""
+        playable_width = width - sidebar_width
+        return PlacementMask(river_polygon, playable_width, height, grid_size, origin=FORBIDDEN_DISTANCE,
+                             border=0, river_margin=FORBIDDEN_DISTANCE, distance_raster=distance_raster)
+
     def contains(self, pos):
         """Check if the given position (pos) is within the station area."""
         px, py = pos
-        distance = ((px - self.x) ** 2 + (py - self.y) ** 2) ** 0.5
 
-        if self.shape == "circle":
-            return distance <= self.radius
-        elif self.shape == "square":
+        shape = self.shape_id
+        if shape == CIRCLE:
+            dx, dy = px - self.x, py - self.y
+            return dx * dx + dy * dy <= self.radius * self.radius
+        elif shape == SQUARE:
             return (self.x - self.radius <= px <= self.x + self.radius) and \
                    (self.y - self.radius <= py <= self.y + self.radius)
-        elif self.shape == "triangle":
+        elif shape == TRIANGLE:
             # For simplicity, use the bounding box of the triangle
             height = (self.radius * (3 ** 0.5)) / 2
             return (self.x - self.radius <= px <= self.x + self.radius) and \
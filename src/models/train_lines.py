@@ -1,19 +1,25 @@
 
-import pygame
+import numpy as np
 
 from utils.constants import TRAIN_LINE_THICKNESS
+from utils.tracing import LINE_CONNECTED, tracer
 class TrainLine:
-    def __init__(self, color):
+    def __init__(self, color, index=0):
         self.color = color  # Line color
+        self.index = index  # Position in the game's list of lines
         self.stations = []  # List of connected stations
         self.trains = []    # Trains operating on this line
         self.active = False  # Whether this line is selected
         self.blocked = False  # Blocked until unlocked
         self.sidebar_center = None  # Sidebar position (to be set later)
         self.sidebar_rect = None  # Clickable area for the line selector
+        self._geometry = {}  # (start, end, index) -> (path points, corner points)
+        self._path = None  # Whole-line path for train motion
+        self.version = 0  # Bumped on every edit so viewers know when to redraw
     
     def set_sidebar_position(self, center):
         """Set the sidebar circle's position and bounding rectangle."""
+        import pygame
         self.sidebar_center = center
         self.sidebar_rect = pygame.Rect(center[0] - 20, center[1] - 20, 40, 40)
     
@@ -27,86 +33,131 @@ class TrainLine:
                 self.stations.append(station1)
             if station2 not in self.stations:
                 self.stations.append(station2)
-            print(f"Connected {station1.shape} at ({station1.x}, {station1.y}) to {station2.shape} at ({station2.x}, {station2.y}).")
+            self.invalidate_geometry()
+            if tracer.info:
+                tracer.emit(LINE_CONNECTED, self.index, station1.index, station2.index)
+
+    def invalidate_geometry(self):
+            """Forget cached segment geometry after the line was edited."""
+            self._geometry.clear()
+            self._path = None
+            self.version += 1
+
+    def segment_geometry(self, station1, station2, index=0):
+            """Return the offset path and rounded corner positions between two stations."""
+            start = (station1.x, station1.y)
+            end = (station2.x, station2.y)
+            key = (start, end, index)
+            geometry = self._geometry.get(key)
+            if geometry is None:
+                points = offset_path(calculate_simplified_path(start, end), index)
+
+                # A corner is any vertex where the path turns
+                corners = [
+                    points[j] for j in range(1, len(points) - 1)
+                    if points[j - 1][0] != points[j + 1][0] and points[j - 1][1] != points[j + 1][1]
+                ]
+                geometry = self._geometry[key] = (points, corners)
+            return geometry
+
+    def path(self):
+            """
+            Return the vertices, cumulative lengths and stop distances of the drawn line.
+            Needs at least two stations; cached until the line is edited.
+            """
+            if self._path is None:
+                vertices = []
+                stops = []
+                for i in range(len(self.stations) - 1):
+                    points, _ = self.segment_geometry(self.stations[i], self.stations[i + 1], self.index)
+                    stops.append(len(vertices))
+                    vertices.extend(points)
+                stops.append(len(vertices) - 1)
+
+                vertices = np.array(vertices, dtype=np.float64)
+                lengths = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(vertices, axis=0).T))))
+                self._path = (vertices, lengths, lengths[stops])
+            return self._path
+
+    def position_at(self, distance):
+            """Point on the drawn line at the given path distance."""
+            vertices, lengths, _ = self.path()
+            i = min(max(int(np.searchsorted(lengths, distance, side="right")) - 1, 0), len(lengths) - 2)
+            span = lengths[i + 1] - lengths[i]
+            t = (distance - lengths[i]) / span if span else 0.0
+            x, y = vertices[i] + (vertices[i + 1] - vertices[i]) * t
+            return float(x), float(y)
 
     def draw(self, screen, index=0):
             """Draw the train line connecting all stations."""
-            if len(self.stations) > 1:
-                for i in range(len(self.stations) - 1):
-                    start = (self.stations[i].x, self.stations[i].y)
-                    end = (self.stations[i + 1].x, self.stations[i + 1].y)
-                    path = calculate_simplified_path(start, end)
-                    offset_path_points = offset_path(path, index)
-                    
-                    # Draw the line
-                    pygame.draw.lines(screen, self.color, False, offset_path_points, TRAIN_LINE_THICKNESS)
-
-                    # Draw rounded corners
-                    for j in range(1, len(offset_path_points) - 1):
-                        prev_point = offset_path_points[j - 1]
-                        current_point = offset_path_points[j]
-                        next_point = offset_path_points[j + 1]
-                        if prev_point[0] != next_point[0] and prev_point[1] != next_point[1]:
-                            # A turn is detected
-                            center = current_point
-                            radius = TRAIN_LINE_THICKNESS  # Adjust as needed
-                            pygame.draw.circle(screen, self.color, center, radius)
+            import pygame
+            for i in range(len(self.stations) - 1):
+                points, corners = self.segment_geometry(self.stations[i], self.stations[i + 1], index)
+
+                # Draw the line
+                pygame.draw.lines(screen, self.color, False, points, TRAIN_LINE_THICKNESS)
+
+                # Draw rounded corners
+                for center in corners:
+                    pygame.draw.circle(screen, self.color, center, TRAIN_LINE_THICKNESS)
     
-def add_connection(self, station1, station2):
-    """Add a connection between two stations."""
-    if station1 not in self.stations:
-        self.stations.append(station1)
-    if station2 not in self.stations:
-        self.stations.append(station2)
-    print(f"Connected {station1.shape} at ({station1.x}, {station1.y}) to {station2.shape} at ({station2.x}, {station2.y}).")
 def draw_rounded_corner(screen, color, center, radius, start_angle, end_angle):
     """
     Draw a rounded corner between two segments.
     """
+    import pygame
     pygame.draw.arc(screen, color, (center[0] - radius, center[1] - radius, radius * 2, radius * 2),
                     start_angle, end_angle, 3)
 def offset_path(path, offset_index, spacing=TRAIN_LINE_THICKNESS):
     """
     Offset a path slightly to avoid overlap between lines.
+    Interior vertices are mitred so the offset segments stay joined.
     """
-    if offset_index == 0:
+    if offset_index == 0 or len(path) < 2:
         return path  # No offset for the first line
 
-    # Offset direction based on perpendicular vector
-    offset_path = []
-    for i in range(len(path) - 1):
-        x1, y1 = path[i]
-        x2, y2 = path[i + 1]
-
-        # Perpendicular vector
+    # Unit perpendicular of every segment
+    normals = []
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
         dx, dy = y2 - y1, x1 - x2
         length = (dx ** 2 + dy ** 2) ** 0.5
-        dx, dy = dx / length, dy / length
+        normals.append((dx / length, dy / length))
 
-        # Apply offset
-        offset_x, offset_y = dx * spacing * offset_index, dy * spacing * offset_index
-        offset_path.append((x1 + offset_x, y1 + offset_y))
-        offset_path.append((x2 + offset_x, y2 + offset_y))
+    distance = spacing * offset_index
+    offset_points = []
+    for i, (x, y) in enumerate(path):
+        if i == 0 or i == len(path) - 1:
+            nx, ny = normals[0] if i == 0 else normals[-1]
+            offset_points.append((x + nx * distance, y + ny * distance))
+        else:
+            # Miter: move along the bisector so both neighbouring segments keep the offset
+            (ax, ay), (bx, by) = normals[i - 1], normals[i]
+            scale = distance / (1 + ax * bx + ay * by)
+            offset_points.append((x + (ax + bx) * scale, y + (ay + by) * scale))
 
-    return offset_path
+    return offset_points
 
 def calculate_simplified_path(start, end):
     """
-    Calculate a simplified path from start to end, following horizontal, vertical, 
-    or 45-degree increments with intermediate points.
+    Calculate a simplified path from start to end, following horizontal, vertical,
+    or 45-degree increments. Returns at most three vertices: a straight run
+    along the dominant axis followed by a diagonal.
     """
-    path = [start]
     x1, y1 = start
     x2, y2 = end
+    dx, dy = x2 - x1, y2 - y1
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+
+    if (dx, dy) == (0, 0):
+        return [start]
+    if abs(dx) > abs(dy):  # Move horizontally until the rest is diagonal
+        corner = (x1 + step_x * (abs(dx) - abs(dy)), y1)
+    elif abs(dy) > abs(dx):  # Move vertically until the rest is diagonal
+        corner = (x1, y1 + step_y * (abs(dy) - abs(dx)))
+    else:  # Pure diagonal
+        return [start, end]
 
-    while (x1, y1) != (x2, y2):
-        if abs(x2 - x1) > abs(y2 - y1):  # Move horizontally
-            x1 += 1 if x2 > x1 else -1
-        elif abs(y2 - y1) > abs(x2 - x1):  # Move vertically
-            y1 += 1 if y2 > y1 else -1
-        else:  # Move diagonally
-            x1 += 1 if x2 > x1 else -1
-            y1 += 1 if y2 > y1 else -1
-        path.append((x1, y1))
-
-    return path
+    if corner == end:
+        return [start, end]
+    return [start, corner, end]
@@ -1,37 +1,103 @@
-import pygame
-
+from models.passengers import Passenger
+from models.world import WorldState
+from utils.constants import SHAPES, TRAIN_SIZE
+from utils.tracing import PASSENGER_BOARDED, PASSENGER_DELIVERED, PASSENGER_TRANSFERRED, tracer
 
 class Train:
-    def __init__(self, line, capacity=6):
+    """A train on a line; its motion state and load are rows of the WorldState train arrays."""
+
+    __slots__ = ("world", "index", "line", "capacity")
+
+    def __init__(self, line, capacity=6, world=None):
+        self.world = world if world is not None else WorldState(line_count=line.index + 1)
+        self.index = self.world.add_train(line.index)
         self.line = line  # TrainLine object
         self.capacity = capacity  # Max passengers
-        self.passengers = []  # Passengers on the train
-        self.current_station_index = 0  # Index in the line's stations list
-
-    def move(self):
-        """Move the train to the next station on the line."""
-        if len(self.line.stations) > 1:
-            self.current_station_index = (self.current_station_index + 1) % len(self.line.stations)
-
-    def pick_up_passengers(self, station):
-        """Pick up passengers from a station."""
-        while len(self.passengers) < self.capacity and station.passengers:
-            passenger = station.passengers.pop(0)  # Oldest passenger first
-            if passenger.shape in [s.shape for s in self.line.stations]:
-                self.passengers.append(passenger)
-                print(f"Passenger picked up from {station.shape} at ({station.x}, {station.y})")
-
-    def drop_off_passengers(self, station):
-        """Drop off passengers at their destination."""
-        remaining_passengers = []
-        for passenger in self.passengers:
-            if passenger.shape == station.shape:
-                print(f"Passenger dropped off at {station.shape} at ({station.x}, {station.y})")
-            else:
-                remaining_passengers.append(passenger)
-        self.passengers = remaining_passengers
+
+    @classmethod
+    def view(cls, world, index, line, capacity=6):
+        """Wrap an existing train row instead of adding one."""
+        train = cls.__new__(cls)
+        train.world = world
+        train.index = index
+        train.line = line
+        train.capacity = capacity
+        return train
+
+    @property
+    def distance(self):
+        """Distance travelled along the line's path from its first stop."""
+        return float(self.world.train_distance[self.index])
+
+    @property
+    def position(self):
+        return self.line.position_at(self.distance)
+
+    @property
+    def load(self):
+        """Number of passengers on board."""
+        return int(self.world.train_load[self.index].sum())
+
+    @property
+    def passengers(self):
+        """Passengers on board, grouped by destination."""
+        return [Passenger(shape_id) for shape_id, count in enumerate(self.world.train_load[self.index].tolist())
+                for _ in range(count)]
+
+    def next_stop(self):
+        """
+        The station the train leaves for from the stop it is at, turning around at either end of the line.
+        Only meaningful while the train is stopped, before the engine moves its target on.
+        """
+        stations = self.line.stations
+        target = int(self.world.train_target[self.index])
+        direction = int(self.world.train_direction[self.index])
+        following = target + direction
+        if not 0 <= following < len(stations):
+            following = target - direction
+        return stations[following]
+
+    def pick_up_passengers(self, station, router):
+        """Board passengers whose next hop from this station is the train's next stop, lowest shape id first."""
+        waiting = self.world.waiting[station.index]
+        load = self.world.train_load[self.index]
+        free = self.capacity - int(load.sum())
+        next_stop = self.next_stop().index
+        for shape_id in range(len(SHAPES)):
+            if free == 0:
+                break
+            count = min(int(waiting[shape_id]), free)
+            if count and router.rides(station.index, shape_id, next_stop):
+                waiting[shape_id] -= count
+                load[shape_id] += count
+                free -= count
+                if tracer.debug:
+                    for _ in range(count):
+                        tracer.emit(PASSENGER_BOARDED, station.index, shape_id, self.index)
+
+    def drop_off_passengers(self, station, router):
+        """
+        Drop off passengers at their destination and return how many were delivered.
+        Passengers whose next hop is not the train's next stop get off here to transfer.
+        """
+        load = self.world.train_load[self.index]
+        next_stop = self.next_stop().index
+        delivered = int(load[station.shape_id])
+        load[station.shape_id] = 0
+        if tracer.debug:
+            for _ in range(delivered):
+                tracer.emit(PASSENGER_DELIVERED, station.index, station.shape_id, self.index)
+        for shape_id in range(len(SHAPES)):
+            count = int(load[shape_id])
+            if count and not router.rides(station.index, shape_id, next_stop):
+                self.world.waiting[station.index, shape_id] += count  # Transfer
+                load[shape_id] = 0
+                if tracer.debug:
+                    for _ in range(count):
+                        tracer.emit(PASSENGER_TRANSFERRED, station.index, shape_id, self.index)
+        return delivered
 
     def draw(self, screen):
-        """Draw the train at its current station."""
-        current_station = self.line.stations[self.current_station_index]
-        pygame.draw.circle(screen, self.line.color, (current_station.x, current_station.y), 10)  # Train size
+        """Draw the train at its position on the line and return the touched area."""
+        import pygame
+        return pygame.draw.circle(screen, self.line.color, self.position, TRAIN_SIZE)
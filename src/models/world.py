@@ -0,0 +1,121 @@
+import numpy as np
+
+from utils.constants import SHAPES
+
+STATION_ARRAYS = ("station_x", "station_y", "station_shape", "spawn_timer", "waiting")
+TRAIN_ARRAYS = ("train_line", "train_distance", "train_direction", "train_target", "train_load")
+
+
+class WorldState:
+    """
+    Struct-of-arrays storage for stations, their waiting passengers and trains.
+
+    Station i is described by row i of the station arrays. Passengers bound
+    for the same shape are interchangeable, so stations and trains only count
+    them per destination shape; boarding and alighting cost O(shapes) however
+    many are waiting. Train motion state is kept the same way so all trains
+    can be moved at once. Station and Train objects are thin views over this state.
+    """
+
+    def __init__(self, station_capacity=16, train_capacity=8, line_count=0):
+        self.station_count = 0
+        self.station_x = np.zeros(station_capacity, dtype=np.int32)
+        self.station_y = np.zeros(station_capacity, dtype=np.int32)
+        self.station_shape = np.zeros(station_capacity, dtype=np.int8)
+        self.spawn_timer = np.zeros(station_capacity, dtype=np.float64)  # Time of the last passenger spawn
+        self.waiting = np.zeros((station_capacity, len(SHAPES)), dtype=np.int32)  # Passengers per destination shape
+
+        # Trains move along their line's path, measured in pixels from its first stop
+        self.train_count = 0
+        self.train_line = np.zeros(train_capacity, dtype=np.int64)
+        self.train_distance = np.zeros(train_capacity, dtype=np.float64)
+        self.train_direction = np.ones(train_capacity, dtype=np.int64)  # +1 towards the last stop, -1 back
+        self.train_target = np.zeros(train_capacity, dtype=np.int64)  # Index of the next stop
+        self.train_load = np.zeros((train_capacity, len(SHAPES)), dtype=np.int32)  # Riders per destination shape
+
+        # Path distance of every stop, one row per line
+        self.line_stop_count = np.zeros(line_count, dtype=np.int64)
+        self.line_stops = np.zeros((line_count, station_capacity), dtype=np.float64)
+
+    def add_station(self, x, y, shape_id):
+        """Append a station and return its index."""
+        if self.station_count == len(self.station_x):
+            self._grow(STATION_ARRAYS, 2 * len(self.station_x))
+        index = self.station_count
+        self.station_x[index] = x
+        self.station_y[index] = y
+        self.station_shape[index] = shape_id
+        self.spawn_timer[index] = 0
+        self.waiting[index] = 0
+        self.station_count += 1
+        return index
+
+    def add_train(self, line_index):
+        """Append a train waiting at the first stop of a line and return its index."""
+        if self.train_count == len(self.train_line):
+            self._grow(TRAIN_ARRAYS, 2 * len(self.train_line))
+        index = self.train_count
+        self.train_line[index] = line_index
+        self.train_distance[index] = 0
+        self.train_direction[index] = 1
+        self.train_target[index] = 1
+        self.train_load[index] = 0
+        self.train_count += 1
+        return index
+
+    def set_line_stops(self, line_index, stops):
+        """Store the path distance of every stop of a line."""
+        if len(stops) > self.line_stops.shape[1]:
+            line_stops = np.zeros((len(self.line_stops), 2 * len(stops)), dtype=np.float64)
+            line_stops[:, :self.line_stops.shape[1]] = self.line_stops
+            self.line_stops = line_stops
+        self.line_stops[line_index, :len(stops)] = stops
+        self.line_stop_count[line_index] = len(stops)
+
+    def push_passenger(self, station, shape_id):
+        """Add a passenger bound for shape_id to a station."""
+        self.waiting[station, shape_id] += 1
+
+    def waiting_shapes(self, station):
+        """Shape ids of the passengers waiting at a station, grouped by destination."""
+        return np.repeat(np.arange(len(SHAPES)), self.waiting[station])
+
+    def write_state(self, writer):
+        """Append the live rows of every array to a SnapshotWriter."""
+        for name in STATION_ARRAYS:
+            writer.write(getattr(self, name)[:self.station_count])
+        for name in TRAIN_ARRAYS:
+            writer.write(getattr(self, name)[:self.train_count])
+        writer.write(self.line_stop_count)
+        writer.write(self.line_stops)
+
+    def read_state(self, reader):
+        """Overwrite this state with one written by write_state, growing arrays only when they are too small."""
+        rows = [reader.read(getattr(self, name).dtype) for name in STATION_ARRAYS]
+        self.station_count = len(rows[0])
+        if len(self.station_x) < self.station_count:
+            self._grow(STATION_ARRAYS, self.station_count)
+        for name, row in zip(STATION_ARRAYS, rows):
+            getattr(self, name)[:self.station_count] = row
+
+        rows = [reader.read(getattr(self, name).dtype) for name in TRAIN_ARRAYS]
+        self.train_count = len(rows[0])
+        if len(self.train_line) < self.train_count:
+            self._grow(TRAIN_ARRAYS, self.train_count)
+        for name, row in zip(TRAIN_ARRAYS, rows):
+            getattr(self, name)[:self.train_count] = row
+
+        self.line_stop_count[:] = reader.read(self.line_stop_count.dtype)
+        line_stops = reader.read(self.line_stops.dtype)
+        if line_stops.shape != self.line_stops.shape:
+            self.line_stops = line_stops.copy()
+        else:
+            self.line_stops[:] = line_stops
+
+    def _grow(self, names, capacity):
+        """Give the named arrays room for capacity rows, keeping their contents."""
+        for name in names:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
@@ -0,0 +1,106 @@
+import pygame
+
+from utils.constants import BEIGE, HEIGHT, TARGET_FPS, WIDTH
+from utils.helpers import draw_forbidden_area
+from utils.profiler import NULL_PROFILER
+from utils.sidebar import Sidebar, draw_profiler_overlay, draw_temporary_line
+from utils.sprites import SpriteAtlas
+
+
+class Renderer:
+    """
+    Layered pygame viewer for a SimulationEngine.
+
+    The map layer (background, river, forbidden areas, stations) is rebuilt only
+    when a station is added, and the line layer only when a line changes.
+    Passengers, trains and the temporary line are drawn on top every frame, the
+    sidebar only when what it shows changes, and only the areas they touched are
+    sent to the display.
+    Each drawing phase is timed by the profiler, whose numbers can be shown in the sidebar.
+    """
+
+    def __init__(self, screen, fps=TARGET_FPS, profiler=None):
+        self.screen = screen
+        self.fps = fps  # Frame cap, 0 for uncapped
+        self.profiler = profiler or NULL_PROFILER
+        self.show_profiler = False  # Overlay the profiler's numbers on the sidebar
+        self.sidebar = Sidebar()
+        self.sprites = SpriteAtlas()  # Stations and passengers are blitted from prebuilt sprites
+        self._overlay_drawn = False
+        self.clock = pygame.time.Clock()
+        self.map_layer = pygame.Surface((WIDTH, HEIGHT))
+        self.line_layer = pygame.Surface((WIDTH, HEIGHT))  # Map layer with the lines on top
+        self._map_key = None
+        self._line_key = None
+        self._dirty_rects = []  # Dynamic areas drawn in the previous frame
+
+    def tick(self):
+        """Wait for the next frame slot and return the time since the last one in seconds."""
+        return self.clock.tick(self.fps) / 1000
+
+    def _update_layers(self, engine):
+        """Rebuild the cached layers that are out of date. Returns True if any was rebuilt."""
+        map_key = (engine.generation, len(engine.stations))
+        line_key = (engine.generation,) + tuple(line.version for line in engine.lines)
+        rebuild_map = map_key != self._map_key
+        rebuild_lines = rebuild_map or line_key != self._line_key
+
+        if rebuild_map:
+            with self.profiler.phase("map_layer"):
+                self.map_layer.fill(BEIGE)  # Background color
+                draw_forbidden_area(self.map_layer, engine.river_polygon, engine.stations)  # Draw forbidden areas
+                self.sprites.draw_stations(self.map_layer, engine.stations)
+            self._map_key = map_key
+
+        if rebuild_lines:
+            with self.profiler.phase("line_layer"):
+                self.line_layer.blit(self.map_layer, (0, 0))
+                for index, line in enumerate(engine.lines):
+                    line.draw(self.line_layer, index=index)
+            self._line_key = line_key
+
+        return rebuild_lines
+
+    def draw(self, engine, running, play_button, restart_button, temporary_line_start=None, temporary_mouse_pos=None,
+             speed_label="1x"):
+        """Draw one frame of the engine state and push the changed areas to the display."""
+        profiler = self.profiler
+        full_redraw = self._update_layers(engine)
+
+        # Restore what the previous frame's dynamic objects covered
+        with profiler.phase("restore"):
+            if full_redraw:
+                self.screen.blit(self.line_layer, (0, 0))
+            else:
+                self.screen.blits([(self.line_layer, rect, rect) for rect in self._dirty_rects], doreturn=False)
+
+        # Dynamic layer, kept off the sidebar so it never needs redrawing on their account
+        self.screen.set_clip(self.line_layer.get_rect())
+        rects = []
+        with profiler.phase("passengers"):
+            rects.extend(self.sprites.draw_passengers(self.screen, engine.world))
+        with profiler.phase("trains"):
+            for train in engine.trains:
+                rects.append(train.draw(self.screen))
+        if temporary_line_start and temporary_mouse_pos:
+            rect = draw_temporary_line(self.screen, temporary_line_start, temporary_mouse_pos, engine.active_line)
+            if rect:
+                rects.append(rect)
+        self.screen.set_clip(None)
+
+        with profiler.phase("sidebar"):
+            # The overlay changes every frame, and hiding it needs one more redraw
+            if self.show_profiler or self._overlay_drawn:
+                self.sidebar.invalidate()
+            sidebar_rect = self.sidebar.draw(self.screen, engine.elapsed_time, play_button, restart_button, running,
+                                             engine.score, engine.lines, speed_label)
+            if self.show_profiler:
+                draw_profiler_overlay(self.screen, profiler)
+            self._overlay_drawn = self.show_profiler
+
+        with profiler.phase("present"):
+            if full_redraw:
+                pygame.display.flip()
+            else:
+                pygame.display.update(self._dirty_rects + rects + ([sidebar_rect] if sidebar_rect else []))
+        self._dirty_rects = rects
@@ -0,0 +1,60 @@
+import argparse
+import time
+
+from engine import SimulationEngine
+from utils.profiler import FrameProfiler
+from utils.session import CONNECT, SELECT_LINE, Recording
+from utils.tracing import LEVEL_NAMES, tracer
+
+
+def replay(recording, profiler=None):
+    """
+    Rerun a recorded game headlessly, as fast as the simulation allows.
+    Inputs are applied at the same engine ticks they were recorded at, so the
+    replay ends in exactly the state the recorded game ended in.
+    """
+    engine = SimulationEngine(tick=recording.tick, seed=recording.seed, profiler=profiler)
+    if engine.map_data.get("name") != recording.map_name:
+        raise ValueError(f"Recording was made on map '{recording.map_name}', "
+                         f"but its seed picked '{engine.map_data.get('name')}'. Are the same maps installed?")
+
+    for tick, kind, line, a, b in recording.events:
+        while engine.ticks < tick:
+            engine.update()
+        if kind == SELECT_LINE:
+            engine.select_line(engine.lines[line])
+        elif kind == CONNECT:
+            engine.connect(engine.stations[a], engine.stations[b], engine.lines[line])
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game headlessly and time it.")
+    parser.add_argument("recording", help="File written by main.py --record")
+    parser.add_argument("--trace", help="Write game events to this file, see utils/tracing.py")
+    parser.add_argument("--trace-level", choices=LEVEL_NAMES[:-1], default="info", help="Lowest event level to trace")
+    parser.add_argument("--profile", action="store_true", help="Print a per-phase breakdown of the tick time")
+    parser.add_argument("--profile-out", help="Export the breakdown, as JSON for a .json path and CSV otherwise")
+    args = parser.parse_args()
+
+    recording = Recording(args.recording)
+    if args.trace:
+        tracer.start(args.trace, LEVEL_NAMES.index(args.trace_level))
+    profiler = FrameProfiler() if args.profile or args.profile_out else None
+    start = time.perf_counter()
+    engine = replay(recording, profiler)
+    elapsed = time.perf_counter() - start
+    tracer.stop()
+
+    print(f"Replayed {engine.ticks} ticks ({engine.elapsed_time:.1f}s of game time) in {elapsed:.3f}s "
+          f"({engine.ticks / elapsed:.0f} ticks/s)")
+    print(f"Stations: {len(engine.stations)}, waiting passengers: {int(engine.world.waiting.sum())}, "
+          f"score: {engine.score}")
+    if args.profile:
+        profiler.report()
+    if args.profile_out:
+        profiler.export(args.profile_out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import time
+
+from utils.constants import MAX_FRAME_SKIP, MAX_FRAME_TIME, TARGET_FPS, TIME_SCALES
+
+
+class SimulationClock:
+    """
+    Drives a SimulationEngine from the wall clock at a selectable time scale.
+
+    Each frame's wall time is scaled into game time and run as fixed engine
+    ticks, so a slow frame is caught up on the next one. A scale of None runs
+    ticks for a whole frame interval instead and renders once per interval.
+    When the ticks of a scaled frame take longer than a frame interval,
+    rendering is skipped for up to MAX_FRAME_SKIP frames so the logic is not
+    held back by the display.
+    """
+
+    def __init__(self, engine, scale_index=0, fps=TARGET_FPS):
+        self.engine = engine
+        self.scale_index = scale_index
+        self.frame_interval = 1 / fps
+        self.skipped_frames = 0
+        self._behind = False
+
+    @property
+    def scale(self):
+        """Game seconds per wall second, or None for as fast as possible."""
+        return TIME_SCALES[self.scale_index]
+
+    @property
+    def label(self):
+        return "max" if self.scale is None else f"{self.scale}x"
+
+    def set_scale(self, index):
+        self.scale_index = index % len(TIME_SCALES)
+
+    def cycle_scale(self):
+        self.set_scale(self.scale_index + 1)
+
+    def advance(self, frame_time):
+        """Run the engine for one frame that took frame_time wall seconds. Returns the ticks run."""
+        start = time.perf_counter()
+        if self.scale is None:
+            # Keep ticking until this frame's share of wall time is used up
+            deadline = start + self.frame_interval
+            ticks = 0
+            while time.perf_counter() < deadline:
+                self.engine.update()
+                ticks += 1
+            self._behind = False
+        else:
+            # A long stall (dragging the window, a breakpoint) is not worth catching up on
+            ticks = self.engine.step(min(frame_time, MAX_FRAME_TIME) * self.scale)
+            self._behind = time.perf_counter() - start > self.frame_interval
+        return ticks
+
+    def should_render(self):
+        """Whether to draw this frame; false while the logic is falling behind, up to MAX_FRAME_SKIP frames in a row."""
+        if self._behind and self.skipped_frames < MAX_FRAME_SKIP:
+            self.skipped_frames += 1
+            return False
+        self.skipped_frames = 0
+        return True
@@ -1,24 +1,17 @@
 
-import pygame
-
-# Initialize Pygame Font
-pygame.font.init()
-
 # Font Sizes
 TITLE_FONT_SIZE = 48
 CLOCK_FONT_SIZE = 36
 SMALL_FONT_SIZE = 24
-
-# Font Objects
-TITLE_FONT = pygame.font.Font(None, TITLE_FONT_SIZE)
-CLOCK_FONT = pygame.font.Font(None, CLOCK_FONT_SIZE)
-SMALL_FONT = pygame.font.Font(None, SMALL_FONT_SIZE)
+PROFILER_FONT_SIZE = 16
+# Font objects are created on first use by utils.sidebar.get_font
 
 # Dimensions
 WIDTH = 800
 HEIGHT = 400
 SIDEBAR_WIDTH = 150
 SCREEN_WIDTH = WIDTH + SIDEBAR_WIDTH
+TARGET_FPS = 60  # Frame cap for the viewer
 BORDER_MARGIN = 20
 RIVER_MARGIN = 30
 FORBIDDEN_DISTANCE = 80
@@ -27,7 +20,13 @@ PASSENGER_RADIUS = 5
 STATION_SPAWN_INTERVAL = 10
 PASSENGER_SPAWN_INTERVAL = 5
 TRAIN_SIZE = 10
-TRAIN_SPEED = 1
+SNAP_DISTANCE = 30  # Releasing a drag this close to a station connects to it
+STATION_CELL_SIZE = 2 * SNAP_DISTANCE  # Spatial hash cells; hit and snap queries touch at most 3x3 of them
+TRAIN_SPEED = 60  # Pixels per second along the line
+SIMULATION_TICK = 1 / 30  # Fixed logic step in seconds
+TIME_SCALES = [1, 4, 16, None]  # Selectable game speeds; None runs as fast as possible
+MAX_FRAME_TIME = 0.25  # Longest wall-clock frame the simulation catches up on
+MAX_FRAME_SKIP = 5  # Frames left undrawn in a row while the simulation falls behind
 
 
 # Colors Map
@@ -45,6 +44,10 @@ BUTTON_BG = (255, 255, 255)
 BUTTON_BORDER = (100, 100, 100)
 TEXT_COLOR = (50, 50, 50)
 
+# Station and passenger shapes, indexed by shape id
+SHAPES = ["circle", "square", "triangle"]
+CIRCLE, SQUARE, TRIANGLE = range(len(SHAPES))
+
 # Colors Stations
 GREEN = (0, 255, 0)
 RED = (255, 0, 0)
@@ -55,12 +58,14 @@ ORANGE = (255, 165, 0)
 
 # Train Lines
 TRAIN_LINE_THICKNESS = 5
+LINE_COLORS = [RED, BLUE, YELLOW]
 
 # Colors Passangers
 DARK_GREY = (80, 80, 80)
 
 # Paths
 SAVE_PATH = "maps/generated"
+MAP_PACK_PATH = "maps/generated.pack"  # Built from SAVE_PATH by maps/compile_map_pack.py
 
 DOT_RADIUS = 2  # Increase the radius for better visibility
 GRID_SIZE = 10 # Space between each dot in the grid
\ No newline at end of file
@@ -1,34 +1,30 @@
 import random
-from shapely.geometry import LineString, Point
-from utils.constants import BORDER_MARGIN, DOT_RADIUS, FORBIDDEN_DISTANCE, HEIGHT, RIVER_MARGIN, WIDTH
+from utils.constants import DOT_RADIUS, HEIGHT, MAP_PACK_PATH, SAVE_PATH, WIDTH
 from utils.helpers import load_random_map
+from utils.map_pack import build_river_polygon, current_map_pack
 
-def initialize_game(width=WIDTH, height=HEIGHT):
-    map_data = load_random_map()
-    river_path = map_data["river"]["path"]
-    river_polygon = LineString(river_path).buffer(25, cap_style=2)
-    return map_data, river_polygon
+def initialize_game(width=WIDTH, height=HEIGHT, rng=random):
+    """
+    Pick a random map. Returns (map_data, river_polygon, distance_raster).
+    Maps come from the compiled pack when it is up to date; the raster is None for JSON maps.
+    """
+    pack = current_map_pack(MAP_PACK_PATH, SAVE_PATH)
+    if pack is not None:
+        return pack.load_random(rng)
+    map_data = load_random_map(rng=rng)
+    return map_data, build_river_polygon(map_data), None
 
-import pygame
-from shapely.geometry import Point
 
-def draw_grid_dots(screen, river_polygon, existing_stations, width, height, grid_size=50, sidebar_width=200):
+def draw_grid_dots(screen, placement_mask):
     """
     Draw dots representing possible station positions, excluding the sidebar area.
     Green = Valid placement
     Red = Forbidden zone
     """
+    import pygame
 
-    for x in range(BORDER_MARGIN, width-BORDER_MARGIN+1, grid_size):
-        for y in range(BORDER_MARGIN, height-BORDER_MARGIN+1, grid_size):
-            station_point = Point(x, y)
-
-            # Check validity
-            is_valid = (
-                river_polygon.distance(station_point) > RIVER_MARGIN and
-                all(station_point.distance(Point(s.x, s.y)) > FORBIDDEN_DISTANCE for s in existing_stations)
-            )
-
+    for i, x in enumerate(placement_mask.xs):
+        for j, y in enumerate(placement_mask.ys):
             # Draw the dot
-            color = (0, 255, 0) if is_valid else (255, 0, 0)  # Green for valid, red for forbidden
-            pygame.draw.circle(screen, color, (x, y), DOT_RADIUS)
+            color = (0, 255, 0) if placement_mask.valid[i, j] else (255, 0, 0)  # Green for valid, red for forbidden
+            pygame.draw.circle(screen, color, (int(x), int(y)), DOT_RADIUS)
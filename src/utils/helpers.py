@@ -1,24 +1,40 @@
 import os
 import json
-import pygame
 import random
-from utils.constants import BLACK, BORDER_MARGIN, DARK_GREY, FORBIDDEN_DISTANCE, HEIGHT, LIGHT_BLUE, SHADOW_COLOR, STATION_SIZE, WHITE, WIDTH 
+# pygame is imported by the drawing functions themselves, so the map loaders work headless
+from utils.constants import BLACK, BORDER_MARGIN, CIRCLE, DARK_GREY, FORBIDDEN_DISTANCE, HEIGHT, LIGHT_BLUE, SHADOW_COLOR, SQUARE, STATION_SIZE, TRIANGLE, WHITE, WIDTH
 # Colors
 DARK_BEIGE = (220, 220, 200)
 
 # Load Random Map
-def load_random_map(save_path="maps/generated"):
+def load_random_map(save_path="maps/generated", rng=random):
     if not os.path.exists(save_path):
         raise FileNotFoundError(f"Map directory '{save_path}' does not exist.")
-    map_files = [f for f in os.listdir(save_path) if f.endswith(".json")]
+    map_files = sorted(f for f in os.listdir(save_path) if f.endswith(".json"))  # Sorted so a seed picks the same map
     if not map_files:
         raise FileNotFoundError(f"No map files found in '{save_path}'. Please generate maps first.")
-    selected_file = random.choice(map_files)
+    selected_file = rng.choice(map_files)
     with open(os.path.join(save_path, selected_file), "r") as f:
-        return json.load(f)
+        map_data = json.load(f)
+    map_data["name"] = selected_file
+    return map_data
+
+def load_all_maps(save_path="maps/generated"):
+    """Load every saved map, sorted by file name."""
+    if not os.path.exists(save_path):
+        raise FileNotFoundError(f"Map directory '{save_path}' does not exist.")
+    map_files = sorted(f for f in os.listdir(save_path) if f.endswith(".json"))
+    if not map_files:
+        raise FileNotFoundError(f"No map files found in '{save_path}'. Please generate maps first.")
+    maps = []
+    for map_file in map_files:
+        with open(os.path.join(save_path, map_file), "r") as f:
+            maps.append(json.load(f))
+    return maps
 
 def draw_forbidden_area(screen, river_polygon, stations):
     """Visualize forbidden areas on the map."""
+    import pygame
     # River forbidden area
     if not river_polygon.is_empty:
         points = [(int(x), int(y)) for x, y in river_polygon.exterior.coords]
@@ -38,19 +54,20 @@ def draw_forbidden_area(screen, river_polygon, stations):
 # Draw Station
 def draw_station(screen, station):
     """Draw a station with a shadow for a professional look."""
-    x, y, shape = station.x, station.y, station.shape  # Access station attributes
+    import pygame
+    x, y, shape = station.x, station.y, station.shape_id  # Access station attributes
     shadow_offset = 3
     half_size = STATION_SIZE // 2
 
     # Shadow
-    if shape == "square":
+    if shape == SQUARE:
         pygame.draw.rect(
             screen, SHADOW_COLOR,
             (x - half_size + shadow_offset, y - half_size + shadow_offset, STATION_SIZE, STATION_SIZE)
         )
-    elif shape == "circle":
+    elif shape == CIRCLE:
         pygame.draw.circle(screen, SHADOW_COLOR, (int(x) + shadow_offset, int(y) + shadow_offset), half_size)
-    elif shape == "triangle":
+    elif shape == TRIANGLE:
         height = (STATION_SIZE * (3**0.5)) / 2
         points = [
             (x, y - height // 2 + shadow_offset),
@@ -60,7 +77,7 @@ def draw_station(screen, station):
         pygame.draw.polygon(screen, SHADOW_COLOR, points)
 
     # Station
-    if shape == "square":
+    if shape == SQUARE:
         pygame.draw.rect(
             screen, WHITE,
             (x - half_size, y - half_size, STATION_SIZE, STATION_SIZE)
@@ -69,10 +86,10 @@ def draw_station(screen, station):
             screen, BLACK,
             (x - half_size, y - half_size, STATION_SIZE, STATION_SIZE), 3
         )
-    elif shape == "circle":
+    elif shape == CIRCLE:
         pygame.draw.circle(screen, WHITE, (int(x), int(y)), half_size)
         pygame.draw.circle(screen, BLACK, (int(x), int(y)), half_size, 3)
-    elif shape == "triangle":
+    elif shape == TRIANGLE:
         height = (STATION_SIZE * (3**0.5)) / 2
         points = [
             (x, y - height // 2),
@@ -90,19 +107,22 @@ def print_all_stations(stations):
     print("--------------------------------")
 
 def draw_passengers(screen, passengers):
-    """Draw all passengers near their respective stations."""
+    """Draw all passengers near their respective stations and return the touched areas."""
+    import pygame
     PASSENGER_RADIUS = 5  # Smaller size for passengers
 
+    rects = []
     for passenger in passengers:
         x, y = passenger.position
-        if passenger.shape == "circle":
-            pygame.draw.circle(screen, DARK_GREY, (int(x), int(y)), PASSENGER_RADIUS)  # Dark gray circle
-        elif passenger.shape == "square":
-            pygame.draw.rect(screen, DARK_GREY, (x - PASSENGER_RADIUS, y - PASSENGER_RADIUS, PASSENGER_RADIUS * 2, PASSENGER_RADIUS * 2))  # Dark gray square
-        elif passenger.shape == "triangle":
+        if passenger.shape_id == CIRCLE:
+            rects.append(pygame.draw.circle(screen, DARK_GREY, (int(x), int(y)), PASSENGER_RADIUS))  # Dark gray circle
+        elif passenger.shape_id == SQUARE:
+            rects.append(pygame.draw.rect(screen, DARK_GREY, (x - PASSENGER_RADIUS, y - PASSENGER_RADIUS, PASSENGER_RADIUS * 2, PASSENGER_RADIUS * 2)))  # Dark gray square
+        elif passenger.shape_id == TRIANGLE:
             points = [
                 (x, y - PASSENGER_RADIUS),
                 (x - PASSENGER_RADIUS, y + PASSENGER_RADIUS),
                 (x + PASSENGER_RADIUS, y + PASSENGER_RADIUS),
             ]
-            pygame.draw.polygon(screen, DARK_GREY, points)  # Dark gray triangle
+            rects.append(pygame.draw.polygon(screen, DARK_GREY, points))  # Dark gray triangle
+    return rects
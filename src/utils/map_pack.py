@@ -0,0 +1,180 @@
+import json
+import os
+import random
+import warnings
+from functools import lru_cache
+
+import numpy as np
+from shapely.geometry import LineString, Polygon
+
+from utils.constants import GRID_SIZE
+from utils.placement import water_distance_raster
+
+# Layout: MAGIC, little-endian uint32 header length, JSON header, then raw arrays
+# aligned to ALIGNMENT bytes at the offsets listed in the header.
+MAGIC = b"MMPK"
+VERSION = 2
+ALIGNMENT = 64
+
+
+def build_river_polygon(map_data):
+    """Buffer the river path of a map into the forbidden water polygon."""
+    river_path = map_data["river"]["path"]
+    return LineString(river_path).buffer(25, cap_style=2)
+
+
+def compile_map(map_data, grid_size=GRID_SIZE):
+    """
+    Precompute the packed arrays for one map: river path, polygon rings and water distance raster.
+    The polygon is kept as its exterior ring followed by any holes, where the river loops back on itself.
+    """
+    river_polygon = build_river_polygon(map_data)
+    rings = [river_polygon.exterior, *river_polygon.interiors]
+    return {
+        "path": np.asarray(map_data["river"]["path"], dtype=np.float64),
+        "polygon": [np.asarray(ring.coords, dtype=np.float64) for ring in rings],
+        "distance": water_distance_raster(river_polygon, map_data["width"], map_data["height"], grid_size),
+        "curve_type": map_data["river"].get("curve_type"),
+        "width": map_data["width"],
+        "height": map_data["height"],
+    }
+
+
+def write_map_pack(pack_path, names, compiled_maps, grid_size=GRID_SIZE):
+    """Write compiled maps into a single memory-mappable pack file."""
+    path_offsets = np.cumsum([0] + [len(m["path"]) for m in compiled_maps]).astype(np.int64)
+    rings = [ring for m in compiled_maps for ring in m["polygon"]]
+    polygon_offsets = np.cumsum([0] + [len(m["polygon"]) for m in compiled_maps]).astype(np.int64)
+    ring_offsets = np.cumsum([0] + [len(ring) for ring in rings]).astype(np.int64)
+    arrays = {
+        "path_offsets": path_offsets,
+        "paths": np.concatenate([m["path"] for m in compiled_maps]),
+        "polygon_offsets": polygon_offsets,  # Into the rings; each map's exterior ring comes first
+        "ring_offsets": ring_offsets,  # Into the vertices
+        "polygons": np.concatenate(rings),
+        "distance": np.stack([m["distance"] for m in compiled_maps]).astype(np.float32),
+        "sizes": np.array([(m["width"], m["height"]) for m in compiled_maps], dtype=np.int64),
+    }
+
+    header = {
+        "version": VERSION,
+        "grid_size": grid_size,
+        "names": list(names),
+        "curve_types": [m["curve_type"] for m in compiled_maps],
+        "arrays": {},
+    }
+    # Offsets change the header length, so leave some slack between the header and the data
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header_bytes = json.dumps(header).encode()
+    data_start = -(-(len(MAGIC) + 4 + len(header_bytes) + 1024) // ALIGNMENT) * ALIGNMENT
+    for entry in header["arrays"].values():
+        entry["offset"] += data_start
+    header_bytes = json.dumps(header).encode()
+
+    with open(pack_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array(len(header_bytes), dtype="<u4").tobytes())
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(header["arrays"][name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+    print(f"Packed {len(compiled_maps)} maps into {pack_path}")
+
+
+def compile_map_pack(save_path, pack_path, grid_size=GRID_SIZE):
+    """Compile every JSON map in save_path into a pack file."""
+    names = sorted(f for f in os.listdir(save_path) if f.endswith(".json"))
+    compiled_maps = []
+    for name in names:
+        with open(os.path.join(save_path, name), "r") as f:
+            compiled_maps.append(compile_map(json.load(f), grid_size))
+    write_map_pack(pack_path, names, compiled_maps, grid_size)
+
+
+class MapPack:
+    """
+    Read-only view of a pack file. The file is memory-mapped once and every
+    array handed out is a slice of that mapping, so loading a map copies nothing.
+    """
+
+    def __init__(self, pack_path):
+        self.pack_path = pack_path
+        self._data = np.memmap(pack_path, dtype=np.uint8, mode="r")
+        if bytes(self._data[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"'{pack_path}' is not a map pack.")
+        header_length = int(self._data[len(MAGIC):len(MAGIC) + 4].view("<u4")[0])
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(bytes(self._data[header_start:header_start + header_length]))
+        if self.header["version"] != VERSION:
+            raise ValueError(f"Unsupported map pack version {self.header['version']}.")
+
+        self.names = self.header["names"]
+        self.grid_size = self.header["grid_size"]
+        for name, entry in self.header["arrays"].items():
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"]))
+            array = self._data[entry["offset"]:entry["offset"] + count * dtype.itemsize].view(dtype)
+            setattr(self, name, array.reshape(entry["shape"]))
+
+    def __len__(self):
+        return len(self.names)
+
+    def river_path(self, index):
+        return self.paths[self.path_offsets[index]:self.path_offsets[index + 1]]
+
+    def polygon_rings(self, index):
+        """Vertex arrays of one map's river polygon: the exterior ring, then the holes."""
+        return [self.polygons[self.ring_offsets[ring]:self.ring_offsets[ring + 1]]
+                for ring in range(self.polygon_offsets[index], self.polygon_offsets[index + 1])]
+
+    def load(self, index):
+        """Return (map_data, river_polygon, distance_raster) for one map."""
+        width, height = (int(v) for v in self.sizes[index])
+        map_data = {
+            "name": self.names[index],
+            "width": width,
+            "height": height,
+            "river": {"path": self.river_path(index), "curve_type": self.header["curve_types"][index]},
+        }
+        exterior, *holes = self.polygon_rings(index)
+        return map_data, Polygon(exterior, holes), self.distance[index]
+
+    def load_random(self, rng=random):
+        return self.load(rng.randrange(len(self)))
+
+
+@lru_cache(maxsize=None)
+def open_map_pack(pack_path):
+    """Open a pack once per process; later calls share the same mapping."""
+    return MapPack(pack_path)
+
+
+@lru_cache(maxsize=None)
+def current_map_pack(pack_path, save_path, grid_size=GRID_SIZE):
+    """
+    The pack at pack_path if it can stand in for the JSON maps in save_path, else None.
+    A pack older than the newest JSON map is ignored with a warning, since the maps were
+    regenerated after it was compiled, and so is a pack written in an older layout.
+    Raises ValueError for a pack compiled for another grid size.
+    """
+    if not os.path.exists(pack_path):
+        return None
+    if os.path.isdir(save_path):
+        newest = max((os.path.getmtime(os.path.join(save_path, name)) for name in os.listdir(save_path)
+                      if name.endswith(".json")), default=0.0)
+        if newest > os.path.getmtime(pack_path):
+            warnings.warn(f"Ignoring '{pack_path}': it is older than the maps in '{save_path}'. "
+                          f"Run maps/compile_map_pack.py to rebuild it.", stacklevel=2)
+            return None
+    try:
+        pack = open_map_pack(pack_path)
+    except ValueError as error:
+        warnings.warn(f"Ignoring '{pack_path}': {error} Run maps/compile_map_pack.py to rebuild it.", stacklevel=2)
+        return None
+    if pack.grid_size != grid_size:
+        raise ValueError(f"'{pack_path}' was compiled for grid size {pack.grid_size}, not {grid_size}. "
+                         f"Run maps/compile_map_pack.py to rebuild it.")
+    return pack
@@ -0,0 +1,119 @@
+import random
+import numpy as np
+import shapely
+
+from utils.constants import BORDER_MARGIN, FORBIDDEN_DISTANCE, GRID_SIZE, HEIGHT, RIVER_MARGIN, WIDTH
+
+
+def water_distance_raster(river_polygon, width=WIDTH, height=HEIGHT, grid_size=GRID_SIZE):
+    """Distance to the river sampled every grid_size pixels from (0, 0), indexed [x, y]."""
+    grid_x, grid_y = np.meshgrid(np.arange(0, width, grid_size), np.arange(0, height, grid_size), indexing="ij")
+    return shapely.distance(river_polygon, shapely.points(grid_x, grid_y)).astype(np.float32)
+
+
+class PlacementMask:
+    """
+    Raster of candidate station positions for one map.
+    The river and border tests run once when the mask is built; placing a
+    station afterwards only clears the cells within FORBIDDEN_DISTANCE of it.
+    A precomputed water_distance_raster for the same grid size skips the shapely query.
+    """
+
+    def __init__(self, river_polygon, width=WIDTH, height=HEIGHT, grid_size=GRID_SIZE, origin=BORDER_MARGIN,
+                 border=BORDER_MARGIN, river_margin=RIVER_MARGIN, forbidden_distance=FORBIDDEN_DISTANCE,
+                 distance_raster=None):
+        self.grid_size = grid_size
+        self.origin = origin
+        self.forbidden_distance = forbidden_distance
+        self.xs = np.arange(origin, width, grid_size)
+        self.ys = np.arange(origin, height, grid_size)
+
+        # Static part: far enough from the river and inside the map border
+        grid_x, grid_y = np.meshgrid(self.xs, self.ys, indexing="ij")
+        if distance_raster is not None and origin % grid_size == 0:
+            first = origin // grid_size
+            river_distance = distance_raster[first:first + len(self.xs), first:first + len(self.ys)]
+            if river_distance.shape != grid_x.shape:
+                raise ValueError("distance_raster does not cover this grid; was it computed for another grid size?")
+        else:
+            river_distance = shapely.distance(river_polygon, shapely.points(grid_x, grid_y))
+        self.base = (
+            (river_distance > river_margin)
+            & (grid_x >= border) & (grid_x <= width - border)
+            & (grid_y >= border) & (grid_y <= height - border)
+        )
+        self.reset()
+
+    def reset(self):
+        """Forget all placed stations and go back to the static mask."""
+        self.valid = self.base.copy()
+
+        # Valid cells are kept densely packed so sampling one is O(1)
+        self._cells = np.flatnonzero(self.valid)
+        self._slots = np.full(self.valid.size, -1, dtype=np.int64)
+        self._slots[self._cells] = np.arange(len(self._cells))
+        self.count = len(self._cells)
+
+    def write_state(self, writer):
+        """Append the packed list of valid cells to a SnapshotWriter; the rest of the state follows from it."""
+        writer.write(self._cells[:self.count].astype(np.int32))
+
+    def read_state(self, reader):
+        """Overwrite the placed-station state with one written by write_state for the same map."""
+        cells = reader.read(np.int32)
+        self.count = len(cells)
+        self._cells[:self.count] = cells
+        self.valid[:] = False
+        self.valid.ravel()[cells] = True
+        self._slots[:] = -1
+        self._slots[cells] = np.arange(self.count)
+
+    def position(self, cell):
+        """Map coordinates of a flat cell index."""
+        i, j = divmod(int(cell), len(self.ys))
+        return int(self.xs[i]), int(self.ys[j])
+
+    def is_valid(self, x, y):
+        """Check whether a station may be placed at the given grid position."""
+        i, ri = divmod(x - self.origin, self.grid_size)
+        j, rj = divmod(y - self.origin, self.grid_size)
+        if ri or rj or not (0 <= i < len(self.xs) and 0 <= j < len(self.ys)):
+            return False
+        return bool(self.valid[i, j])
+
+    def sample(self, rng=random):
+        """Pick a random valid position, or None when the map is full."""
+        if self.count == 0:
+            return None
+        return self.position(self._cells[rng.randrange(self.count)])
+
+    def occupy(self, x, y):
+        """Clear every cell within the forbidden distance of a new station."""
+        distance = self.forbidden_distance
+        i0 = max(0, -(-(x - distance - self.origin) // self.grid_size))
+        i1 = min(len(self.xs), (x + distance - self.origin) // self.grid_size + 1)
+        j0 = max(0, -(-(y - distance - self.origin) // self.grid_size))
+        j1 = min(len(self.ys), (y + distance - self.origin) // self.grid_size + 1)
+        if i0 >= i1 or j0 >= j1:
+            return
+
+        dx = self.xs[i0:i1, None] - x
+        dy = self.ys[None, j0:j1] - y
+        window = self.valid[i0:i1, j0:j1]
+        cleared = window & (dx * dx + dy * dy <= distance * distance)
+        window[cleared] = False
+
+        ii, jj = np.nonzero(cleared)
+        self._remove((ii + i0) * len(self.ys) + (jj + j0))
+
+    def _remove(self, cells):
+        """Drop cleared cells from the packed list, filling their slots from the tail."""
+        new_count = self.count - len(cells)
+        slots = self._slots[cells]
+        holes = slots[slots < new_count]
+        tail = self._cells[new_count:self.count]
+        movers = tail[self.valid.ravel()[tail]]  # Tail cells that stay valid
+        self._cells[holes] = movers
+        self._slots[movers] = holes
+        self._slots[cells] = -1
+        self.count = new_count
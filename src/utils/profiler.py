@@ -0,0 +1,99 @@
+import csv
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    """
+    Times named phases with the monotonic perf_counter clock.
+    Each phase keeps its last `window` durations in a ring so percentiles
+    follow what is happening now, plus running totals for the whole session.
+
+        with profiler.phase("draw"):
+            ...
+    """
+
+    def __init__(self, window=300):
+        self.window = window
+        self.phases = {}  # Name -> ring of durations in seconds, in first-seen order
+        self.counts = {}
+        self.totals = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """Record one duration for a phase."""
+        ring = self.phases.get(name)
+        if ring is None:
+            ring = self.phases[name] = np.zeros(self.window)
+            self.counts[name] = 0
+            self.totals[name] = 0.0
+        ring[self.counts[name] % self.window] = seconds
+        self.counts[name] += 1
+        self.totals[name] += seconds
+
+    def percentiles(self, name, q=PERCENTILES):
+        """Rolling percentiles of a phase in milliseconds."""
+        samples = self.phases[name][:min(self.counts[name], self.window)]
+        return np.percentile(samples, q) * 1000
+
+    def summary(self):
+        """One row per phase: calls, total and mean time, and rolling percentiles, in milliseconds."""
+        rows = []
+        for name in self.phases:
+            row = {
+                "phase": name,
+                "count": self.counts[name],
+                "total_ms": self.totals[name] * 1000,
+                "mean_ms": self.totals[name] * 1000 / self.counts[name],
+            }
+            for q, value in zip(PERCENTILES, self.percentiles(name)):
+                row[f"p{q}_ms"] = float(value)
+            rows.append(row)
+        return rows
+
+    def report(self):
+        """Print the summary as a table."""
+        print(f"{'phase':<22}{'count':>9}{'total ms':>12}{'mean ms':>10}" + "".join(f"{f'p{q} ms':>10}" for q in PERCENTILES))
+        for row in self.summary():
+            print(f"{row['phase']:<22}{row['count']:>9}{row['total_ms']:>12.1f}{row['mean_ms']:>10.3f}"
+                  + "".join(f"{row[f'p{q}_ms']:>10.3f}" for q in PERCENTILES))
+
+    def export(self, path):
+        """Write the summary to path, as JSON if it ends in .json and CSV otherwise."""
+        rows = self.summary()
+        with open(path, "w", newline="") as f:
+            if path.endswith(".json"):
+                json.dump(rows, f, indent=2)
+            else:
+                writer = csv.DictWriter(f, fieldnames=["phase", "count", "total_ms", "mean_ms"]
+                                        + [f"p{q}_ms" for q in PERCENTILES])
+                writer.writeheader()
+                writer.writerows(rows)
+        print(f"Profile written to {path}")
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; its phases do nothing."""
+
+    _context = nullcontext()
+
+    def phase(self, name):
+        return self._context
+
+    def add(self, name, seconds):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,138 @@
+import heapq
+import math
+
+import numpy as np
+
+from utils.constants import SHAPES
+
+
+class Router:
+    """
+    Next-hop tables over the station/line network.
+
+    For every station and destination shape the router keeps the distance to the
+    nearest station of that shape and the first station to travel to. Edges join
+    consecutive stations of a line and are weighted by their straight-line length.
+    The network only ever grows, so new stations and connections are absorbed by
+    relaxing distances outwards from the stations they touch.
+    """
+
+    def __init__(self, capacity=16):
+        self.distance = np.full((len(SHAPES), capacity), np.inf)
+        self.next_station = np.full((len(SHAPES), capacity), -1, dtype=np.int64)
+        self.neighbours = []  # Per station: {neighbour: weight}
+        self.edge_lines = {}  # (station, neighbour) -> set of line ids running along that edge
+        self.positions = []
+        self._synced = {}  # Line id -> number of its stations already turned into edges
+        self.version = 0  # Bumped whenever the network changes
+        self._arrays = (None, None, None, None)  # (version, positions, neighbour pairs, edge lines) last written or read
+
+    def add_station(self, index, x, y, shape_id):
+        """Register a new station; it becomes a destination for its own shape."""
+        if index >= self.distance.shape[1]:
+            capacity = 2 * max(index, self.distance.shape[1])
+            distance = np.full((len(SHAPES), capacity), np.inf)
+            distance[:, :self.distance.shape[1]] = self.distance
+            next_station = np.full((len(SHAPES), capacity), -1, dtype=np.int64)
+            next_station[:, :self.next_station.shape[1]] = self.next_station
+            self.distance, self.next_station = distance, next_station
+        self.neighbours.append({})
+        self.positions.append((x, y))
+        self.version += 1
+        self.distance[shape_id, index] = 0
+        self.next_station[shape_id, index] = index
+        self._propagate(shape_id, [index])
+
+    def sync_line(self, line_id, stations):
+        """Add the edges of a line that were appended since the last call."""
+        synced = self._synced.get(line_id, 0)
+        for i in range(max(synced - 1, 0), len(stations) - 1):
+            self.add_edge(stations[i].index, stations[i + 1].index, line_id)
+        self._synced[line_id] = len(stations)
+
+    def add_edge(self, a, b, line_id):
+        """Connect two stations on a line and update every affected next hop."""
+        self.version += 1
+        for u, v in ((a, b), (b, a)):
+            self.edge_lines.setdefault((u, v), set()).add(line_id)
+        if b in self.neighbours[a]:
+            return  # Another line already runs here, distances are unchanged
+        (ax, ay), (bx, by) = self.positions[a], self.positions[b]
+        weight = math.hypot(ax - bx, ay - by)
+        self.neighbours[a][b] = weight
+        self.neighbours[b][a] = weight
+        for shape_id in range(len(SHAPES)):
+            self._propagate(shape_id, [a, b])
+
+    def _propagate(self, shape_id, seeds):
+        """Dijkstra from stations whose distance may have dropped."""
+        distance = self.distance[shape_id]
+        next_station = self.next_station[shape_id]
+        heap = [(distance[seed], seed) for seed in seeds if distance[seed] < np.inf]
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > distance[u]:
+                continue
+            for v, weight in self.neighbours[u].items():
+                if d + weight < distance[v]:
+                    distance[v] = d + weight
+                    next_station[v] = u
+                    heapq.heappush(heap, (d + weight, v))
+
+    def next_hop(self, station, shape_id):
+        """Next station towards the nearest station of shape_id, or -1 if none is reachable."""
+        return int(self.next_station[shape_id, station])
+
+    def rides(self, station, shape_id, next_stop):
+        """Whether a passenger at station bound for shape_id should ride a train leaving for next_stop."""
+        return self.next_station[shape_id, station] == next_stop and next_stop != station
+
+    def write_state(self, writer):
+        """Append the tables and the edge list to a SnapshotWriter."""
+        version, positions, pairs, edge_lines = self._arrays
+        if version != self.version:
+            positions = np.array(self.positions, dtype=np.int64).reshape(-1, 2)
+            # Neighbours go in insertion order, which decides how Dijkstra breaks ties
+            pairs = np.array([(u, v) for u, neighbours in enumerate(self.neighbours) for v in neighbours],
+                             dtype=np.int64).reshape(-1, 2)
+            edge_lines = np.array([(u, v, line_id) for (u, v), line_ids in self.edge_lines.items()
+                                   for line_id in line_ids], dtype=np.int64).reshape(-1, 3)
+            self._arrays = (self.version, positions, pairs, edge_lines)
+        count = len(positions)
+        writer.write(positions)
+        writer.write(self.distance[:, :count])
+        writer.write(self.next_station[:, :count])
+        writer.write(pairs)
+        writer.write(edge_lines)
+        writer.write(np.array(list(self._synced.items()), dtype=np.int64).reshape(-1, 2))
+
+    def read_state(self, reader):
+        """Overwrite the router with one written by write_state; neighbour weights are recomputed from the positions."""
+        positions = reader.read(np.int64)
+        count = len(positions)
+        if count > self.distance.shape[1]:
+            self.distance = np.empty((len(SHAPES), 2 * count))
+            self.next_station = np.empty((len(SHAPES), 2 * count), dtype=np.int64)
+        self.distance[:, count:] = np.inf
+        self.next_station[:, count:] = -1
+        self.distance[:, :count] = reader.read(np.float64)
+        self.next_station[:, :count] = reader.read(np.int64)
+
+        pairs, edge_lines = reader.read(np.int64), reader.read(np.int64)
+        version, known_positions, known_pairs, known_edge_lines = self._arrays
+        unchanged = (version == self.version and np.array_equal(positions, known_positions)
+                     and np.array_equal(pairs, known_pairs) and np.array_equal(edge_lines, known_edge_lines))
+        if not unchanged:
+            # Branches usually share their network, so it is only rebuilt when it differs
+            self.positions = [tuple(position) for position in positions.tolist()]
+            self.neighbours = [{} for _ in range(count)]
+            for u, v in pairs.tolist():
+                (ux, uy), (vx, vy) = self.positions[u], self.positions[v]
+                self.neighbours[u][v] = math.hypot(ux - vx, uy - vy)
+            self.edge_lines = {}
+            for u, v, line_id in edge_lines.tolist():
+                self.edge_lines.setdefault((u, v), set()).add(line_id)
+            self.version += 1
+            self._arrays = (self.version, positions, pairs, edge_lines)
+        self._synced = dict(reader.read(np.int64).tolist())
@@ -0,0 +1,81 @@
+import argparse
+import random
+import struct
+
+# Recording layout: a header, then one fixed-size record per player input in the
+# order they happened, closed by an END record holding the last simulated tick.
+RECORDING_MAGIC = b"MMRC"
+RECORDING_VERSION = 1
+HEADER = struct.Struct("<4sBQdH")  # Magic, version, seed, tick length, map name length (name follows)
+RECORD = struct.Struct("<IBbhh")  # Engine tick, kind, line index, station a, station b
+
+# Record kinds
+SELECT_LINE, CONNECT, END = range(3)
+
+
+def parse_seed(text):
+    """argparse type for session seeds, which recordings store as unsigned 64-bit integers."""
+    seed = int(text)
+    if not 0 <= seed < 2 ** 64:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {2 ** 64 - 1}, got {seed}")
+    return seed
+
+
+class Session:
+    """
+    Seed and random stream of one game.
+    Every random choice the engine makes is drawn from rng, so the same seed
+    and the same inputs at the same ticks always play out the same game.
+    """
+
+    def __init__(self, seed=None):
+        self.seed = random.randrange(2 ** 64) if seed is None else seed
+        self.rng = random.Random(self.seed)
+
+
+class InputRecorder:
+    """Collects player inputs as fixed-size binary records keyed by engine tick."""
+
+    def __init__(self):
+        self.header = b""
+        self.buffer = bytearray()
+
+    def start(self, seed, tick, map_name=None):
+        """Begin a new recording for a freshly reset engine."""
+        name = (map_name or "").encode()
+        self.header = HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION, seed, tick, len(name)) + name
+        self.buffer.clear()
+
+    def record(self, tick, kind, line=-1, a=-1, b=-1):
+        self.buffer += RECORD.pack(tick, kind, line, a, b)
+
+    def save(self, path, tick):
+        """Write the recording, ending at the given engine tick."""
+        with open(path, "wb") as f:
+            f.write(self.header)
+            f.write(self.buffer)
+            f.write(RECORD.pack(tick, END, -1, -1, -1))
+        print(f"Saved {len(self.buffer) // RECORD.size} inputs over {tick} ticks to {path}")
+
+
+class Recording:
+    """A recording read back from disk: the session seed, tick length, map name and input records."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed, self.tick, name_length = HEADER.unpack_from(data)
+        if magic != RECORDING_MAGIC:
+            raise ValueError(f"'{path}' is not an input recording.")
+        if version != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version {version}.")
+        start = HEADER.size + name_length
+        self.map_name = data[HEADER.size:start].decode() or None
+        self.events = list(RECORD.iter_unpack(data[start:]))
+        if not self.events or self.events[-1][1] != END:
+            raise ValueError(f"Recording '{path}' is truncated.")
+
+    @property
+    def ticks(self):
+        """Number of ticks the recorded game ran for."""
+        return self.events[-1][0]
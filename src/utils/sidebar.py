@@ -1,15 +1,24 @@
+from functools import lru_cache
+
+import numpy as np
 import pygame
-from utils.constants import BLACK, BUTTON_BG, BUTTON_BORDER, HEIGHT, SIDEBAR_GRADIENT_END, SIDEBAR_GRADIENT_START, SIDEBAR_WIDTH, TEXT_COLOR, TITLE_FONT, WIDTH, BLUE, GREEN, GREY, ORANGE, RED, TITLE_FONT, CLOCK_FONT, TEXT_COLOR, YELLOW
+from utils.constants import BLACK, BUTTON_BG, BUTTON_BORDER, HEIGHT, SIDEBAR_GRADIENT_START, SIDEBAR_WIDTH, TEXT_COLOR, WIDTH, BLUE, GREEN, GREY, ORANGE, RED, TEXT_COLOR, YELLOW, TITLE_FONT_SIZE, CLOCK_FONT_SIZE, PROFILER_FONT_SIZE
+
+@lru_cache(maxsize=None)
+def get_font(size):
+    """Default pygame font of the given size, initializing the font module on first use."""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(None, size)
+
+
 def draw_gradient_rect(screen, rect, color1, color2):
-    """Draw a vertical gradient in a rectangle."""
+    """Draw a vertical gradient in a rectangle as one column of colors stretched across its width."""
     x, y, width, height = rect
-    for i in range(height):
-        ratio = i / height
-        color = [
-            int(color1[j] * (1 - ratio) + color2[j] * ratio)
-            for j in range(3)
-        ]
-        pygame.draw.line(screen, color, (x, y + i), (x + width, y + i))
+    ratio = np.arange(height)[:, None] / height
+    colors = (np.array(color1) * (1 - ratio) + np.array(color2) * ratio).astype(np.uint8)
+    column = pygame.surfarray.make_surface(colors[None])
+    screen.blit(pygame.transform.scale(column, (width + 1, height)), (x, y))
 
 def draw_circular_button(screen, rect, icon, is_pressed):
     """Draw a circular button with an icon."""
@@ -37,56 +46,106 @@ def draw_circular_button(screen, rect, icon, is_pressed):
                          (center_x - square_size // 2, center_y - square_size // 2, square_size, square_size))
 
 
-def draw_sidebar(screen, elapsed_time, play_button, restart_button, running, score, lines):
-    """Draw the sidebar with clock, buttons, smaller circles, and scoreboard."""
-    # Sidebar background
-    pygame.draw.rect(screen, SIDEBAR_GRADIENT_START, (WIDTH, 0, SIDEBAR_WIDTH, HEIGHT))
-
-    # Clock
-    minutes, seconds = divmod(int(elapsed_time), 60)
-    clock_text = TITLE_FONT.render(f"{minutes:02}:{seconds:02}", True, TEXT_COLOR)
-    clock_rect = clock_text.get_rect(center=(WIDTH + (SIDEBAR_WIDTH // 2), 30))
-    screen.blit(clock_text, clock_rect)
-
-    # Scoreboard
-    score_text = CLOCK_FONT.render(f"Score: {score}", True, TEXT_COLOR)
-    score_rect = score_text.get_rect(center=(WIDTH + (SIDEBAR_WIDTH // 2), 70))
-    screen.blit(score_text, score_rect)
-
-    # Smaller Circles for Line Selection
-    mouse_pos = pygame.mouse.get_pos()
-    circle_positions = [
-        (WIDTH + SIDEBAR_WIDTH // 2, 110),  # Green
-        (WIDTH + SIDEBAR_WIDTH // 2, 150),  # Red
-        (WIDTH + SIDEBAR_WIDTH // 2, 190),  # Yellow
-        (WIDTH + SIDEBAR_WIDTH // 2, 230),  # Grey (1)
-        (WIDTH + SIDEBAR_WIDTH // 2, 270)   # Grey (2)
-    ]
-    
-    colors = [
-        RED,  # Green
-        BLUE,    # Red
-        YELLOW, # Yellow
-        GREY if score < 10 else GREEN,  # Grey to Blue
-        GREY if score < 20 else ORANGE # Grey to Orange
-    ]
-
-    for pos, color, line in zip(circle_positions, colors, lines):
-        hover = line.sidebar_rect.collidepoint(mouse_pos)  # Check for hover
-        border_thickness = 5 if line.active else (3 if hover else 2)
-        border_color = (255, 255, 255) if line.active else (150, 150, 150)
-        
-        # Draw the outer border for hover and selection
-        pygame.draw.circle(screen, border_color, pos, 17, border_thickness)  # Slightly larger radius for the border
-        # Draw the actual circle
-        pygame.draw.circle(screen, color, pos, 15)
-
-    # Play/Pause and Restart Buttons (Side by Side)
-    play_button.center = (WIDTH + SIDEBAR_WIDTH // 4, HEIGHT - 50)
-    restart_button.center = (WIDTH + (SIDEBAR_WIDTH // 4) * 3, HEIGHT - 50)
-
-    draw_circular_button(screen, play_button, "pause" if running else "play", False)
-    draw_circular_button(screen, restart_button, "restart", False)
+class Sidebar:
+    """
+    The sidebar with clock, buttons, line selectors and scoreboard.
+    The static chrome is prebuilt into one surface and rendered text is cached
+    per string, so a frame whose clock second, score, hover, active line and
+    play state are unchanged costs nothing to draw.
+    """
+
+    # Selector positions and colors; the last two are unlocked by the score
+    CIRCLE_POSITIONS = [(WIDTH + SIDEBAR_WIDTH // 2, 110 + 40 * i) for i in range(5)]
+    MAX_CACHED_TEXTS = 256
+
+    def __init__(self):
+        self.rect = pygame.Rect(WIDTH, 0, SIDEBAR_WIDTH, HEIGHT)
+        self.background = None  # Built on first draw, once the buttons are placed
+        self._texts = {}
+        self._state = None
+
+    def text(self, string, size):
+        """Render string in the default font, reusing the surface when it was rendered before."""
+        key = (string, size)
+        surface = self._texts.get(key)
+        if surface is None:
+            if len(self._texts) >= self.MAX_CACHED_TEXTS:
+                self._texts.clear()
+            surface = self._texts[key] = get_font(size).render(string, True, TEXT_COLOR)
+        return surface
+
+    def _build_background(self, restart_button):
+        background = pygame.Surface(self.rect.size)
+        background.fill(SIDEBAR_GRADIENT_START)
+        restart_button = restart_button.move(-WIDTH, 0)
+        draw_circular_button(background, restart_button, "restart", False)
+        return background
+
+    def invalidate(self):
+        """Redraw on the next call even if nothing changed."""
+        self._state = None
+
+    def draw(self, screen, elapsed_time, play_button, restart_button, running, score, lines, speed_label="1x"):
+        """Draw the sidebar if what it shows changed. Returns its area when redrawn, else None."""
+        # Play/Pause and Restart Buttons (Side by Side)
+        play_button.center = (WIDTH + SIDEBAR_WIDTH // 4, HEIGHT - 50)
+        restart_button.center = (WIDTH + (SIDEBAR_WIDTH // 4) * 3, HEIGHT - 50)
+
+        mouse_pos = pygame.mouse.get_pos()
+        hover = next((i for i, line in enumerate(lines) if line.sidebar_rect.collidepoint(mouse_pos)), None)
+        active = next((i for i, line in enumerate(lines) if line.active), None)
+        state = (int(elapsed_time), score, hover, active, running, len(lines), speed_label)
+        if state == self._state:
+            return None
+        self._state = state
+
+        if self.background is None:
+            self.background = self._build_background(restart_button)
+        screen.blit(self.background, self.rect)
+
+        # Clock
+        minutes, seconds = divmod(int(elapsed_time), 60)
+        clock_text = self.text(f"{minutes:02}:{seconds:02}", TITLE_FONT_SIZE)
+        screen.blit(clock_text, clock_text.get_rect(center=(WIDTH + (SIDEBAR_WIDTH // 2), 30)))
+        speed_text = self.text(speed_label, PROFILER_FONT_SIZE)  # Time scale in the top-right corner
+        screen.blit(speed_text, speed_text.get_rect(topright=(WIDTH + SIDEBAR_WIDTH - 4, 3)))
+
+        # Scoreboard
+        score_text = self.text(f"Score: {score}", CLOCK_FONT_SIZE)
+        screen.blit(score_text, score_text.get_rect(center=(WIDTH + (SIDEBAR_WIDTH // 2), 70)))
+
+        # Smaller Circles for Line Selection
+        colors = [RED, BLUE, YELLOW, GREY if score < 10 else GREEN, GREY if score < 20 else ORANGE]
+        for i, (pos, color, line) in enumerate(zip(self.CIRCLE_POSITIONS, colors, lines)):
+            border_thickness = 5 if line.active else (3 if i == hover else 2)
+            border_color = (255, 255, 255) if line.active else (150, 150, 150)
+
+            # Draw the outer border for hover and selection
+            pygame.draw.circle(screen, border_color, pos, 17, border_thickness)  # Slightly larger radius for the border
+            # Draw the actual circle
+            pygame.draw.circle(screen, color, pos, 15)
+
+        draw_circular_button(screen, play_button, "pause" if running else "play", False)
+        return self.rect
+
+
+def draw_profiler_overlay(screen, profiler, top=215, bottom=HEIGHT - 80):
+    """List the slowest profiled phases by rolling p95 between top and bottom of the sidebar."""
+    font = get_font(PROFILER_FONT_SIZE)
+    row_height = font.get_linesize()
+    rows = (bottom - top) // row_height - 1
+    right = WIDTH + SIDEBAR_WIDTH - 8
+    screen.blit(font.render("phase", True, TEXT_COLOR), (WIDTH + 8, top))
+    header = font.render("p50 / p95 ms", True, TEXT_COLOR)
+    screen.blit(header, header.get_rect(topright=(right, top)))
+
+    stats = [(name, *profiler.percentiles(name, (50, 95))) for name in profiler.phases]
+    stats.sort(key=lambda stat: stat[2], reverse=True)
+    for i, (name, p50, p95) in enumerate(stats[:rows]):
+        y = top + (i + 1) * row_height
+        screen.blit(font.render(name, True, TEXT_COLOR), (WIDTH + 8, y))
+        times = font.render(f"{p50:.2f} / {p95:.2f}", True, TEXT_COLOR)
+        screen.blit(times, times.get_rect(topright=(right, y)))
 
     
 def handle_sidebar_events(event, play_button, restart_button, running):
@@ -98,20 +157,18 @@ def handle_sidebar_events(event, play_button, restart_button, running):
     return running, False
 
 def handle_sidebar_click(lines, mouse_pos):
-    """Handle user clicking on sidebar to select a line color."""
+    """Return the line whose sidebar selector was clicked, if any."""
     for line in lines:
         if line.sidebar_rect.collidepoint(mouse_pos):  # Click inside circle
-            for other_line in lines:
-                other_line.active = False  # Deactivate all other lines
-            line.active = True  # Activate the clicked line
-            print(f"{line.color} line selected.")  # Debugging
+            return line
+    return None
 
 
 
 def draw_temporary_line(screen, start_station, mouse_pos, active_line):
-    """Draw a temporary line using the active line's color."""
+    """Draw a temporary line using the active line's color and return the touched area."""
     if start_station and mouse_pos and active_line:
-        pygame.draw.line(screen, active_line.color, (start_station.x, start_station.y), mouse_pos, 3)
+        return pygame.draw.line(screen, active_line.color, (start_station.x, start_station.y), mouse_pos, 3)
 
 def draw_sidebar_lines(screen, lines):
     """Draw the sidebar circles for line selection."""
@@ -0,0 +1,41 @@
+import struct
+
+import numpy as np
+
+
+class SnapshotWriter:
+    """
+    Collects NumPy arrays into one flat byte string.
+    Each array is stored as its dimension count and shape (int64) followed by its raw data;
+    the reader has to ask for the arrays in the same order and with the same dtypes.
+    """
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, array):
+        array = np.ascontiguousarray(array)
+        self.parts.append(struct.pack(f"<q{array.ndim}q", array.ndim, *array.shape))
+        self.parts.append(array.tobytes())
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+class SnapshotReader:
+    """Reads back the arrays of a SnapshotWriter buffer as read-only views, without copying."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.offset = 0
+
+    def read(self, dtype):
+        (ndim,) = struct.unpack_from("<q", self.buffer, self.offset)
+        shape = struct.unpack_from(f"<{ndim}q", self.buffer, self.offset + 8)
+        self.offset += 8 * (ndim + 1)
+        count = 1
+        for size in shape:
+            count *= size
+        array = np.frombuffer(self.buffer, dtype, count, self.offset).reshape(shape)
+        self.offset += array.nbytes
+        return array
@@ -0,0 +1,83 @@
+from utils.constants import STATION_CELL_SIZE
+
+
+class SpatialHash:
+    """
+    Uniform grid of stations for point and neighbourhood queries.
+    Each station is filed under the cell holding its centre, so a query only
+    visits the few cells its search area overlaps instead of every station.
+    """
+
+    def __init__(self, cell_size=STATION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> [(x, y, station)]
+        self.count = 0
+        self._bounds = None  # Lowest and highest occupied column and row
+
+    def insert(self, station):
+        x, y = station.x, station.y
+        key = (x // self.cell_size, y // self.cell_size)
+        self.cells.setdefault(key, []).append((x, y, station))
+        self.count += 1
+        if self._bounds is None:
+            self._bounds = [key[0], key[1], key[0], key[1]]
+        else:
+            bounds = self._bounds
+            bounds[0], bounds[1] = min(bounds[0], key[0]), min(bounds[1], key[1])
+            bounds[2], bounds[3] = max(bounds[2], key[0]), max(bounds[3], key[1])
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+        self._bounds = None
+
+    def _candidates(self, x, y, radius):
+        """Entries in every cell overlapped by the square of half-size radius around (x, y)."""
+        size = self.cell_size
+        for column in range(int((x - radius) // size), int((x + radius) // size) + 1):
+            for row in range(int((y - radius) // size), int((y + radius) // size) + 1):
+                yield from self.cells.get((column, row), ())
+
+    def within(self, pos, radius):
+        """Stations whose centre lies within radius of pos."""
+        x, y = pos
+        limit = radius * radius
+        return [station for sx, sy, station in self._candidates(x, y, radius)
+                if (sx - x) * (sx - x) + (sy - y) * (sy - y) <= limit]
+
+    def hit(self, pos, reach):
+        """
+        The station whose own shape contains pos, if any.
+        reach is the furthest any station's hit area extends from its centre.
+        """
+        x, y = pos
+        for _, _, station in self._candidates(x, y, reach):
+            if station.contains(pos):
+                return station
+        return None
+
+    def nearest(self, pos, max_distance=None):
+        """The station closest to pos, optionally no further than max_distance."""
+        if self._bounds is None:
+            return None
+        x, y = pos
+        size = self.cell_size
+        column, row = int(x // size), int(y // size)
+        min_column, min_row, max_column, max_row = self._bounds
+        last_ring = max(column - min_column, max_column - column, row - min_row, max_row - row)
+        if max_distance is not None:
+            last_ring = min(last_ring, int(max_distance // size) + 1)
+
+        best, best_distance = None, float("inf") if max_distance is None else max_distance * max_distance
+        # Search outwards one ring of cells at a time; cells in ring k + 1 are at least k cells away
+        for ring in range(max(last_ring, 0) + 1):
+            for c in range(column - ring, column + ring + 1):
+                edge = c in (column - ring, column + ring)
+                for r in (range(row - ring, row + ring + 1) if edge else (row - ring, row + ring)):
+                    for sx, sy, station in self.cells.get((c, r), ()):
+                        distance = (sx - x) * (sx - x) + (sy - y) * (sy - y)
+                        if distance <= best_distance:
+                            best, best_distance = station, distance
+            if best is not None and best_distance <= (ring * size) ** 2:
+                break
+        return best
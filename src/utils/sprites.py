@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pygame
+
+from models.passengers import Passenger
+from utils.constants import SHAPES
+from utils.helpers import draw_passengers, draw_station
+
+SCRATCH_SIZE = 64  # Large enough to hold any station or passenger drawn at its centre
+
+
+def _capture(draw):
+    """
+    Run draw(surface, centre) on a transparent scratch surface and cut out what it drew.
+    Returns (sprite, offset), where offset is the sprite's top-left relative to the centre.
+    """
+    scratch = pygame.Surface((SCRATCH_SIZE, SCRATCH_SIZE), pygame.SRCALPHA)
+    centre = SCRATCH_SIZE // 2
+    draw(scratch, centre)
+    bounds = scratch.get_bounding_rect()
+    sprite = scratch.subsurface(bounds).copy()
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()  # Match the display format for faster blits
+    return sprite, (bounds.x - centre, bounds.y - centre)
+
+
+class SpriteAtlas:
+    """
+    One prebuilt sprite per station and passenger shape.
+    The sprites are captured from draw_station and draw_passengers, so blitting
+    them gives the same pixels as drawing, and a whole set of stations or
+    passengers goes to the screen in a single Surface.blits call.
+    """
+
+    def __init__(self):
+        self.stations = [
+            _capture(lambda surface, c, shape_id=shape_id: draw_station(surface, SimpleNamespace(x=c, y=c, shape_id=shape_id)))
+            for shape_id in range(len(SHAPES))
+        ]
+        self.passengers = [
+            _capture(lambda surface, c, shape_id=shape_id: draw_passengers(surface, [SimpleNamespace(position=(c, c), shape_id=shape_id)]))
+            for shape_id in range(len(SHAPES))
+        ]
+        self._passenger_offsets = np.array([offset for _, offset in self.passengers])
+
+    def draw_stations(self, screen, stations):
+        """Blit every station in one batch and return the touched areas."""
+        blits = []
+        for station in stations:
+            sprite, (dx, dy) = self.stations[station.shape_id]
+            blits.append((sprite, (station.x + dx, station.y + dy)))
+        return screen.blits(blits)
+
+    def draw_passengers(self, screen, world):
+        """
+        Blit every passenger waiting in a WorldState in one batch and return the touched areas.
+        Positions are laid out for all stations at once from the per-destination counts,
+        so each station shows its passengers grouped by destination.
+        """
+        count = world.station_count
+        counts = world.waiting[:count]
+        sizes = counts.sum(axis=1)
+        total = int(sizes.sum())
+        if total == 0:
+            return []
+        station = np.repeat(np.arange(count), sizes)
+        shape = np.repeat(np.tile(np.arange(counts.shape[1]), count), counts.ravel())
+        index = np.arange(total) - np.repeat(np.cumsum(sizes) - sizes, sizes)  # Place in its station's line
+
+        x, y = Passenger.calculate_position((world.station_x[station], world.station_y[station]), index)
+        offsets = self._passenger_offsets[shape]
+        positions = zip((x + offsets[:, 0]).tolist(), (y + offsets[:, 1]).tolist())
+        sprites = [self.passengers[shape_id][0] for shape_id in shape.tolist()]
+        return screen.blits(list(zip(sprites, positions)))
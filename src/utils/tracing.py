@@ -0,0 +1,168 @@
+import json
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Levels, lowest to highest. Events below the tracer's level are never recorded.
+DEBUG, INFO, WARNING, OFF = range(4)
+LEVEL_NAMES = ["debug", "info", "warning", "off"]
+
+# Event kinds and the level each is recorded at. a, b and c are kind-specific integers.
+PASSENGER_SPAWNED, PASSENGER_BOARDED, PASSENGER_DELIVERED, PASSENGER_TRANSFERRED, \
+    STATION_ADDED, STATION_SPAWN_FAILED, LINE_CONNECTED = range(7)
+EVENT_KINDS = [
+    # (name, level, meaning of a, b, c)
+    ("passenger_spawned", DEBUG, ("station", "shape", "")),
+    ("passenger_boarded", DEBUG, ("station", "shape", "train")),
+    ("passenger_delivered", DEBUG, ("station", "shape", "train")),
+    ("passenger_transferred", DEBUG, ("station", "shape", "train")),
+    ("station_added", INFO, ("station", "x", "y")),
+    ("station_spawn_failed", WARNING, ("", "", "")),
+    ("line_connected", INFO, ("line", "station_a", "station_b")),
+]
+
+EVENT_DTYPE = np.dtype([
+    ("time_ns", "<u8"),  # perf_counter_ns() when the event was emitted
+    ("tick", "<u4"),  # Engine tick the event happened in
+    ("kind", "u1"),
+    ("a", "<i4"),
+    ("b", "<i4"),
+    ("c", "<i4"),
+])
+
+# File layout: MAGIC, little-endian uint32 header length, JSON header, then packed EVENT_DTYPE records
+MAGIC = b"MMTR"
+VERSION = 1
+
+
+class Tracer:
+    """
+    Records typed events into a preallocated ring buffer.
+
+    A background thread writes the buffer out in batches, so emitting an event
+    never touches the file. Call sites check the level flag before emitting:
+
+        if tracer.debug:
+            tracer.emit(PASSENGER_SPAWNED, station, shape)
+
+    so a disabled level costs one attribute lookup. When the writer falls a full
+    buffer behind, new events are dropped and counted instead of blocking the game.
+    """
+
+    def __init__(self):
+        self.tick = 0  # Set by the engine every tick
+        self.file = None
+        self._set_level(OFF)
+
+    def _set_level(self, level):
+        self.level = level
+        self.debug = level <= DEBUG
+        self.info = level <= INFO
+        self.warning = level <= WARNING
+
+    def start(self, path, level=INFO, capacity=1 << 16, batch=4096):
+        """Start writing events at or above level to path."""
+        if self.file:
+            self.stop()
+        self.events = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.capacity = capacity
+        self.batch = batch
+        self.head = 0  # Events emitted
+        self.flushed = 0  # Events written to the file
+        self.dropped = 0
+
+        header = json.dumps({
+            "version": VERSION,
+            "level": LEVEL_NAMES[level],
+            "kinds": [{"name": name, "level": LEVEL_NAMES[kind_level], "fields": fields}
+                      for name, kind_level, fields in EVENT_KINDS],
+            "dtype": [(name, EVENT_DTYPE[name].str) for name in EVENT_DTYPE.names],
+        }).encode()
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.file.write(np.array(len(header), dtype="<u4").tobytes())
+        self.file.write(header)
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._flush_loop, name="tracer", daemon=True)
+        self._thread.start()
+        self._set_level(level)
+
+    def emit(self, kind, a=0, b=0, c=0):
+        """Record one event. Callers check the level flag first."""
+        if self.head - self.flushed >= self.capacity:
+            self.dropped += 1
+            return
+        self.events[self.head % self.capacity] = (time.perf_counter_ns(), self.tick, kind, a, b, c)
+        self.head += 1
+        if self.head - self.flushed >= self.batch:
+            self._wake.set()
+
+    def stop(self):
+        """Write out the remaining events and close the file."""
+        if not self.file:
+            return
+        self._set_level(OFF)
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self.file.close()
+        self.file = None
+        if self.dropped:
+            print(f"Tracer dropped {self.dropped} events; consider a larger buffer.")
+
+    def _flush_loop(self):
+        while not self._stopping:
+            self._wake.wait(0.5)
+            self._wake.clear()
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        """Write every event emitted so far; slots are only reused once written."""
+        head = self.head
+        while self.flushed < head:
+            start = self.flushed % self.capacity
+            count = min(head - self.flushed, self.capacity - start)
+            self.file.write(self.events[start:start + count].tobytes())
+            self.flushed += count
+
+
+# Process-wide tracer, disabled until started
+tracer = Tracer()
+
+
+def read_trace(path):
+    """Read a trace file back. Returns (header, events) with events as an EVENT_DTYPE array."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"'{path}' is not a trace file.")
+        header_length = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+        header = json.loads(f.read(header_length))
+        if header["version"] != VERSION:
+            raise ValueError(f"Unsupported trace version {header['version']}.")
+        events = np.fromfile(f, dtype=np.dtype([(name, dtype) for name, dtype in header["dtype"]]))
+    return header, events
+
+
+def main():
+    """Print how often each event kind occurred in a trace file."""
+    if len(sys.argv) != 2:
+        print("Usage: python src/utils/tracing.py TRACE_FILE")
+        return
+    header, events = read_trace(sys.argv[1])
+    if len(events) == 0:
+        print("No events recorded.")
+        return
+    span = (int(events["time_ns"].max()) - int(events["time_ns"].min())) / 1e9
+    print(f"{len(events)} events over {span:.3f}s, ticks {events['tick'].min()}-{events['tick'].max()}")
+    counts = np.bincount(events["kind"], minlength=len(header["kinds"]))
+    for kind, count in zip(header["kinds"], counts):
+        print(f"  {kind['name']:<24}{count:>10}")
+
+
+if __name__ == "__main__":
+    main()
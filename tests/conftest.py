@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Tests import the game modules from src/ and the training scripts from the repository root
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
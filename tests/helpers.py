@@ -0,0 +1,13 @@
+def random_play(engine, ticks, rng, connect_every, advance=None):
+    """
+    Advance engine ticks times (by engine.update unless advance is given), first connecting
+    a random station pair on a random line every connect_every ticks. Yields each tick
+    after it has run, so a test can compare incremental state with a full rebuild.
+    """
+    advance = advance or engine.update
+    for tick in range(ticks):
+        if tick % connect_every == 0 and len(engine.stations) > 1:
+            a, b = rng.sample(engine.stations, 2)
+            engine.connect(a, b, engine.lines[rng.randrange(len(engine.lines))])
+        advance()
+        yield tick
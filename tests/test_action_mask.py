@@ -0,0 +1,58 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+from ai.agent import PolicyNetwork
+from ai.environment import VectorMiniMetroEnv, connection_mask
+from ai.utils import ActionMask, SharedArrays, rollout_buffer_specs
+from engine import SimulationEngine
+from helpers import random_play
+from train_ai import update
+
+
+def test_engine_mask_matches_rebuild():
+    engine = SimulationEngine(seed=5)
+    mask = ActionMask().attach(engine)
+    for tick in random_play(engine, 4000, random.Random(2), 200):
+        if tick % 500 == 0:
+            full = ActionMask()
+            full.reset(engine)
+            assert np.array_equal(full.bits, mask.bits), tick
+
+
+def test_environment_mask_matches_rebuild():
+    env = VectorMiniMetroEnv(8, max_stations=32, step_seconds=5.0, seed=0)
+    obs, _ = env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    for step in range(200):
+        valid = np.unpackbits(obs["action_mask"], axis=-1, bitorder="little")[..., :32].reshape(8, -1)
+        actions = [rng.choice(np.flatnonzero(row)) if row.any() and rng.random() < 0.7 else env.noop_action
+                   for row in valid]
+        obs, _, _, _, _ = env.step(np.array(actions))
+        active = np.arange(32) < env.active_count[:, None]
+        assert np.array_equal(env.action_mask, connection_mask(active, env.line_member)), step
+    env.close()
+
+
+def test_update_carries_last_observation_over():
+    buffers = SharedArrays(rollout_buffer_specs(2, 3, 8, 3))
+    try:
+        rng = np.random.default_rng(0)
+        buffers.stations[:] = rng.random(buffers.stations.shape)
+        buffers.lines[:] = rng.integers(0, 2, buffers.lines.shape)
+        buffers.action_mask[:] = rng.integers(0, 256, buffers.action_mask.shape)
+        buffers.actions[:] = 3 * 8 * 8  # No-op
+        last = [array[-1].copy() for array in (buffers.stations, buffers.lines, buffers.action_mask)]
+
+        torch.manual_seed(0)
+        policy = PolicyNetwork(3)
+        optimizer = torch.optim.SGD(policy.parameters(), lr=0.0)
+        update(SimpleNamespace(buffers=buffers), policy, optimizer, 0.99, 0.5, 0.01)
+
+        for array, expected in zip((buffers.stations, buffers.lines, buffers.action_mask), last):
+            assert np.array_equal(array[0], expected)
+    finally:
+        buffers.close()
+        buffers.unlink()
@@ -0,0 +1,16 @@
+import json
+
+from benchmarks.run_benchmarks import BASELINE_PATH, BENCHMARKS, compare
+
+
+def test_compare_flags_only_slowdowns_past_the_threshold():
+    baseline = {name: {"median_us": 10.0} for name in ("same", "slower", "faster")}
+    results = {"same": {"median_us": 11.0}, "slower": {"median_us": 13.0}, "faster": {"median_us": 5.0},
+               "added": {"median_us": 1.0}}
+    assert compare(results, baseline, 1.25) == ["slower"]
+
+
+def test_baseline_covers_every_benchmark():
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)["results"]
+    assert sorted(baseline) == sorted(name for name, _ in BENCHMARKS)
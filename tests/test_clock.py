@@ -0,0 +1,24 @@
+import pytest
+
+from engine import SimulationEngine
+from utils.clock import SimulationClock
+from utils.constants import MAX_FRAME_SKIP, MAX_FRAME_TIME, TIME_SCALES
+
+
+def test_scaled_frames_run_the_same_ticks_as_stepping():
+    clocked, stepped = SimulationEngine(seed=2), SimulationEngine(seed=2)
+    clock = SimulationClock(clocked, TIME_SCALES.index(4))
+    frames = [1 / 60, 1 / 45, 0.1, 1.0, 1 / 30] * 20
+    ticks = sum(clock.advance(frame) for frame in frames)
+    for frame in frames:
+        stepped.step(min(frame, MAX_FRAME_TIME) * 4)
+    assert ticks == clocked.ticks == stepped.ticks
+    assert clocked.elapsed_time == pytest.approx(stepped.elapsed_time)
+    assert clocked.snapshot() == stepped.snapshot()
+
+
+def test_rendering_is_skipped_for_at_most_max_frame_skip_frames():
+    clock = SimulationClock(SimulationEngine(seed=2))
+    clock._behind = True  # As if every frame's ticks overran the frame interval
+    drawn = [clock.should_render() for _ in range(3 * (MAX_FRAME_SKIP + 1))]
+    assert drawn == ([False] * MAX_FRAME_SKIP + [True]) * 3
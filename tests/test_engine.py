@@ -0,0 +1,20 @@
+from engine import SimulationEngine
+
+
+def play(engine):
+    engine.step(2.0)
+    engine.select_line(engine.lines[1])
+    assert engine.connect(engine.stations[0], engine.stations[1])
+    assert not engine.connect(engine.stations[1], engine.stations[1])
+    for _ in range(900):
+        engine.step(1 / 60)
+
+
+def test_same_seed_and_inputs_play_the_same_game():
+    first, second = SimulationEngine(seed=21), SimulationEngine(seed=21)
+    play(first)
+    play(second)
+    assert first.ticks == second.ticks > 0
+    assert first.snapshot() == second.snapshot()
+    assert first.active_line is first.lines[1]
+    assert [station.index for station in first.lines[1].stations] == [0, 1]
@@ -0,0 +1,34 @@
+import numpy as np
+
+from ai.environment import VectorMiniMetroEnv
+
+
+def test_trains_turn_around_at_end_stops():
+    env = VectorMiniMetroEnv(1, max_stations=8, seed=0)
+    env.reset(seed=0)
+    s = env.max_stations
+    actions = [0 * s * s + 0 * s + 1, 0 * s * s + 1 * s + 2] + [env.noop_action] * 6
+    stops = []
+    for action in actions:
+        env.step(np.array([action]))
+        stops.append(int(env.train_stop[0, 0]))
+    assert stops == [1, 0, 1, 2, 1, 0, 1, 2]
+    env.close()
+
+
+def test_same_seed_replays_the_same_episodes():
+    runs = []
+    for _ in range(2):
+        env = VectorMiniMetroEnv(4, max_stations=16, step_seconds=5.0, seed=3)
+        obs, _ = env.reset(seed=3)
+        rng = np.random.default_rng(0)
+        rewards = []
+        for _ in range(100):
+            obs, reward, _, _, _ = env.step(rng.integers(0, env.noop_action + 1, env.num_envs))
+            rewards.append(reward)
+        runs.append((obs, np.array(rewards)))
+        env.close()
+    (first_obs, first_rewards), (second_obs, second_rewards) = runs
+    assert np.array_equal(first_rewards, second_rewards)
+    for key in first_obs:
+        assert np.array_equal(first_obs[key], second_obs[key])
@@ -0,0 +1,16 @@
+import numpy as np
+
+from maps.generate_maps import generate_map
+
+
+def test_generated_maps_depend_only_on_their_seed():
+    for seed in range(5):
+        first, second = generate_map(seed), generate_map(seed)
+        assert (first is None) == (second is None)
+        if first is None:
+            continue
+        assert first[0] == second[0] == seed
+        for key in ("path", "distance"):
+            assert np.array_equal(first[1][key], second[1][key])
+        assert len(first[1]["polygon"]) == len(second[1]["polygon"])
+        assert all(np.array_equal(a, b) for a, b in zip(first[1]["polygon"], second[1]["polygon"]))
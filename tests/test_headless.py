@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup import CHECK_HEADLESS, ROOT_DIR, STARTUP_BUDGETS
+
+
+@pytest.mark.parametrize("statement", [statement for statement, _ in STARTUP_BUDGETS.values()])
+def test_headless_modules_do_not_import_pygame(statement):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT_DIR, os.path.join(ROOT_DIR, "src")]))
+    result = subprocess.run([sys.executable, "-c", f"{statement}; {CHECK_HEADLESS}"], cwd=ROOT_DIR, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
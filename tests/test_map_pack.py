@@ -0,0 +1,60 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from utils.constants import GRID_SIZE, SAVE_PATH
+from utils.map_pack import build_river_polygon, compile_map, compile_map_pack, current_map_pack, open_map_pack, write_map_pack
+from utils.placement import PlacementMask
+
+MAP_NAME = "map_001.json"
+
+
+@pytest.fixture
+def maps(tmp_path):
+    """A directory holding one of the bundled maps and a pack compiled from it."""
+    save_path = tmp_path / "maps"
+    save_path.mkdir()
+    shutil.copy(os.path.join(SAVE_PATH, MAP_NAME), save_path)
+    pack_path = tmp_path / "maps.pack"
+    compile_map_pack(save_path, pack_path)
+    return str(save_path), str(pack_path)
+
+
+def test_packed_raster_matches_shapely(maps):
+    save_path, pack_path = maps
+    _, river_polygon, distance_raster = current_map_pack(pack_path, save_path).load(0)
+    packed = PlacementMask(river_polygon, distance_raster=distance_raster)
+    direct = PlacementMask(river_polygon)
+    assert np.array_equal(packed.base, direct.base)
+
+
+def test_pack_for_other_grid_size_is_rejected(maps):
+    save_path, pack_path = maps
+    with pytest.raises(ValueError):
+        current_map_pack(pack_path, save_path, GRID_SIZE * 2)
+    _, river_polygon, distance_raster = open_map_pack(pack_path).load(0)
+    with pytest.raises(ValueError):
+        PlacementMask(river_polygon, grid_size=GRID_SIZE // 2, distance_raster=distance_raster)
+
+
+def test_pack_older_than_maps_is_ignored(maps):
+    save_path, pack_path = maps
+    modified = os.path.getmtime(pack_path) + 10
+    os.utime(os.path.join(save_path, MAP_NAME), (modified, modified))
+    with pytest.warns(UserWarning):
+        assert current_map_pack(pack_path, save_path) is None
+
+
+def test_pack_keeps_holes_in_the_river_polygon(tmp_path):
+    # A river that loops back on itself buffers into a polygon with a hole
+    map_data = {"width": 800, "height": 400,
+                "river": {"path": [(100, 100), (400, 100), (400, 300), (100, 300), (100, 100)], "curve_type": None}}
+    river_polygon = build_river_polygon(map_data)
+    assert len(river_polygon.interiors) == 1
+    pack_path = tmp_path / "loop.pack"
+    write_map_pack(pack_path, ["loop.json"], [compile_map(map_data)])
+    _, packed_polygon, _ = open_map_pack(str(pack_path)).load(0)
+    assert len(packed_polygon.interiors) == 1
+    assert packed_polygon.equals(river_polygon)
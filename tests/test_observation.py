@@ -0,0 +1,34 @@
+import random
+
+import numpy as np
+
+from ai.utils import ObservationEncoder
+from engine import SimulationEngine
+from helpers import random_play
+
+
+def test_incremental_encoding_matches_full_encoding():
+    engine = SimulationEngine(seed=3)
+    encoder = ObservationEncoder().attach(engine)
+    for tick in random_play(engine, 6000, random.Random(1), 300):
+        if tick % 997 == 0 or tick == 5999:
+            full = ObservationEncoder()
+            full.engine = engine
+            full.reset(engine)
+            assert np.array_equal(full.stations, encoder.stations), tick
+            assert np.array_equal(full.lines, encoder.lines), tick
+            assert np.array_equal(full.globals, encoder.globals), tick
+
+
+def test_encoder_follows_restore():
+    engine = SimulationEngine(seed=3)
+    encoder = ObservationEncoder().attach(engine)
+    for _ in range(1500):
+        engine.update()
+    snapshot = engine.snapshot()
+    expected = encoder.stations.copy()
+    engine.connect(*engine.stations[:2], engine.lines[0])
+    for _ in range(1500):
+        engine.update()
+    engine.restore(snapshot)
+    assert np.array_equal(encoder.stations, expected)
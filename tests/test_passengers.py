@@ -0,0 +1,25 @@
+import random
+
+from engine import SimulationEngine
+from helpers import random_play
+
+
+def test_passengers_are_conserved():
+    engine = SimulationEngine(seed=9)
+    world = engine.world
+    spawned = []
+    push_passenger = world.push_passenger
+
+    def counting_push(station, shape_id):
+        spawned.append(shape_id)
+        push_passenger(station, shape_id)
+
+    world.push_passenger = counting_push
+    for _ in random_play(engine, 9000, random.Random(4), 250):
+        assert (world.waiting >= 0).all() and (world.train_load >= 0).all()
+        for train in engine.trains:
+            assert train.load <= train.capacity
+
+    # Every spawned passenger is waiting, riding or delivered
+    total = int(world.waiting.sum()) + int(world.train_load.sum()) + engine.score
+    assert engine.score > 0 and total == len(spawned)
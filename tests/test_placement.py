@@ -0,0 +1,31 @@
+import random
+
+import numpy as np
+
+from utils.game_logic import initialize_game
+from utils.placement import PlacementMask
+
+
+def test_occupied_mask_matches_brute_force():
+    _, river_polygon, distance_raster = initialize_game(rng=random.Random(0))
+    mask = PlacementMask(river_polygon, distance_raster=distance_raster)
+    rng = random.Random(1)
+    placed = []
+    while len(placed) < 40:
+        position = mask.sample(rng)
+        if position is None:
+            break
+        assert mask.is_valid(*position)
+        mask.occupy(*position)
+        placed.append(position)
+
+    grid_x, grid_y = np.meshgrid(mask.xs, mask.ys, indexing="ij")
+    expected = mask.base.copy()
+    for x, y in placed:
+        expected &= (grid_x - x) ** 2 + (grid_y - y) ** 2 > mask.forbidden_distance ** 2
+    assert np.array_equal(mask.valid, expected)
+
+    # Sampling draws from the packed list, which must hold exactly the valid cells
+    cells = mask._cells[:mask.count]
+    assert sorted(cells.tolist()) == np.flatnonzero(expected).tolist()
+    assert np.array_equal(mask._slots[cells], np.arange(mask.count))
@@ -0,0 +1,22 @@
+import time
+
+from ai.agent import LookaheadPlanner
+from engine import SimulationEngine
+
+
+def test_plan_returns_within_budget():
+    engine = SimulationEngine(seed=4)
+    for _ in range(1500):
+        engine.update()
+    planner = LookaheadPlanner(workers=2, budget=0.3, horizon=30.0, seed=0)
+    try:
+        moves = planner.candidates(engine)
+        for _ in range(3):
+            start = time.perf_counter()
+            move, report = planner.plan(engine)
+            # Only waiting for the previous decision's leftover rollouts may run over the budget
+            assert time.perf_counter() - start - report["drained"] < planner.budget + 0.1
+            assert move is None or move in moves
+            assert report["rollouts"] > 0
+    finally:
+        planner.close()
@@ -0,0 +1,30 @@
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from utils.profiler import FrameProfiler
+
+
+def test_rolling_percentiles_use_the_last_window():
+    profiler = FrameProfiler(window=10)
+    for i in range(25):
+        profiler.add("tick", i / 1000)
+    assert profiler.counts["tick"] == 25
+    assert profiler.totals["tick"] == pytest.approx(sum(range(25)) / 1000)
+    expected = np.percentile(np.arange(15, 25), (50, 95, 99))
+    assert profiler.percentiles("tick") == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("name", ["profile.json", "profile.csv"])
+def test_export_round_trip(tmp_path, name):
+    profiler = FrameProfiler()
+    for seconds in (0.001, 0.002, 0.003):
+        profiler.add("draw", seconds)
+    path = str(tmp_path / name)
+    profiler.export(path)
+    with open(path) as f:
+        rows = json.load(f) if name.endswith(".json") else list(csv.DictReader(f))
+    assert [row["phase"] for row in rows] == ["draw"]
+    assert float(rows[0]["mean_ms"]) == pytest.approx(2.0)
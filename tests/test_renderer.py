@@ -0,0 +1,28 @@
+import random
+
+import pygame
+
+from engine import SimulationEngine
+from helpers import random_play
+from main import set_sidebar_positions
+from renderer import Renderer
+from utils.constants import HEIGHT, SCREEN_WIDTH, SIDEBAR_WIDTH, WIDTH
+
+
+def test_dirty_rect_frames_match_a_full_redraw():
+    pygame.display.init()
+    try:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, HEIGHT))
+        engine = SimulationEngine(seed=6)
+        set_sidebar_positions(engine.lines)
+        play_button = pygame.Rect(WIDTH + SIDEBAR_WIDTH // 2 - 25, HEIGHT - 80, 50, 50)
+        restart_button = pygame.Rect(WIDTH + SIDEBAR_WIDTH // 2 - 25, HEIGHT - 150, 50, 50)
+        renderer = Renderer(screen, fps=0)
+        for _ in random_play(engine, 300, random.Random(0), 40, advance=lambda: engine.step(1 / 15)):
+            renderer.draw(engine, True, play_button, restart_button)
+
+        fresh = pygame.Surface(screen.get_size())
+        Renderer(fresh, fps=0).draw(engine, True, play_button, restart_button)
+        assert pygame.image.tobytes(screen, "RGB") == pygame.image.tobytes(fresh, "RGB")
+    finally:
+        pygame.display.quit()
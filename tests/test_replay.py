@@ -0,0 +1,31 @@
+import argparse
+import random
+
+import numpy as np
+import pytest
+
+from engine import SimulationEngine
+from helpers import random_play
+from replay import replay
+from utils.session import InputRecorder, Recording, parse_seed
+
+
+def test_replay_ends_in_recorded_state(tmp_path):
+    recorder = InputRecorder()
+    engine = SimulationEngine(seed=1234, recorder=recorder)
+    for _ in random_play(engine, 3000, random.Random(0), 150):
+        pass
+    path = tmp_path / "game.mmrc"
+    recorder.save(path, engine.ticks)
+
+    replayed = replay(Recording(path))
+    assert replayed.ticks == engine.ticks
+    assert replayed.score == engine.score
+    assert replayed.snapshot() == engine.snapshot()
+    assert np.array_equal(replayed.world.waiting, engine.world.waiting)
+
+
+@pytest.mark.parametrize("text", ["-1", str(2 ** 64)])
+def test_seed_outside_recording_range_is_rejected(text):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_seed(text)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from ai.environment import VectorMiniMetroEnv
+from ai.utils import RESET
+from train_ai import RolloutWorkers
+
+ENV_KWARGS = {"max_stations": 16, "step_seconds": 5.0}
+
+
+def test_workers_fill_buffers_like_local_environments():
+    steps, envs_per_worker = 4, 2
+    workers = RolloutWorkers(2, envs_per_worker, steps, seed=5, env_kwargs=ENV_KWARGS)
+    try:
+        rng = np.random.default_rng(0)
+        buffers = workers.buffers
+        buffers.actions[:] = rng.integers(0, workers.action_count, buffers.actions.shape)
+        workers.run(RESET)
+        for step in range(steps):
+            workers.run(step)
+
+        for index in range(2):
+            envs = slice(index * envs_per_worker, (index + 1) * envs_per_worker)
+            env = VectorMiniMetroEnv(envs_per_worker, seed=5 + index, **ENV_KWARGS)
+            observation, _ = env.reset(seed=5 + index)
+            for step in range(steps + 1):
+                for key in ("stations", "lines", "action_mask"):
+                    assert np.array_equal(getattr(buffers, key)[step, envs], observation[key])
+                if step < steps:
+                    observation, reward, terminated, truncated, _ = env.step(buffers.actions[step, envs])
+                    assert np.array_equal(buffers.rewards[step, envs], reward)
+                    assert np.array_equal(buffers.dones[step, envs], terminated | truncated)
+            env.close()
+    finally:
+        workers.close()
@@ -0,0 +1,89 @@
+import heapq
+import math
+import random
+
+import numpy as np
+
+from engine import SimulationEngine
+from utils.constants import SHAPES
+from utils.routing import Router
+
+
+def full_dijkstra(positions, shapes, edges, shape_id):
+    """Distances to the nearest station of shape_id, recomputed over the whole network."""
+    distance = [math.inf] * len(positions)
+    heap = [(0.0, i) for i, shape in enumerate(shapes) if shape == shape_id]
+    for _, i in heap:
+        distance[i] = 0.0
+    heapq.heapify(heap)
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > distance[u]:
+            continue
+        for v in edges.get(u, ()):
+            weight = math.dist(positions[u], positions[v])
+            if d + weight < distance[v]:
+                distance[v] = d + weight
+                heapq.heappush(heap, (d + weight, v))
+    return distance
+
+
+def test_incremental_tables_match_full_dijkstra():
+    rng = random.Random(3)
+    router = Router(capacity=2)
+    positions, shapes, edges = [], [], {}
+    for _ in range(200):
+        if rng.random() < 0.3 or len(positions) < 2:
+            positions.append((rng.randint(0, 800), rng.randint(0, 600)))
+            shapes.append(rng.randrange(len(SHAPES)))
+            router.add_station(len(positions) - 1, *positions[-1], shapes[-1])
+        else:
+            a, b = rng.sample(range(len(positions)), 2)
+            edges.setdefault(a, set()).add(b)
+            edges.setdefault(b, set()).add(a)
+            router.add_edge(a, b, rng.randrange(3))
+
+        count = len(positions)
+        for shape_id in range(len(SHAPES)):
+            distance = full_dijkstra(positions, shapes, edges, shape_id)
+            assert np.allclose(router.distance[shape_id, :count], distance)
+            for station in range(count):
+                hop = router.next_hop(station, shape_id)
+                if distance[station] == math.inf:
+                    assert hop == -1
+                elif shapes[station] != shape_id:
+                    # Ties may pick either neighbour, but the hop has to lie on a shortest path
+                    step = math.dist(positions[station], positions[hop])
+                    assert math.isclose(distance[hop] + step, distance[station])
+                    assert router.rides(station, shape_id, hop)
+
+
+def test_passengers_only_ride_towards_their_next_hop():
+    engine = SimulationEngine(seed=7)
+    a, b, c = engine.stations[:3]  # One station of each shape
+    line = engine.lines[0]
+    engine.connect(a, b, line)
+    engine.connect(b, c, line)
+    train, world = line.trains[0], engine.world
+    world.train_target[train.index] = 1  # Stopped at b, leaving for c
+    world.train_direction[train.index] = 1
+
+    # Bound for a's shape, so the next hop from b is back towards a
+    world.waiting[b.index] = 0
+    b.add_passenger(a.shape_id)
+    train.pick_up_passengers(b, engine.router)
+    assert world.train_load[train.index].tolist() == [0, 0, 0]
+    assert b.passenger_count == 1
+
+    world.train_direction[train.index] = -1  # Leaving for a instead
+    train.pick_up_passengers(b, engine.router)
+    assert world.train_load[train.index, a.shape_id] == 1 and b.passenger_count == 0
+
+    # Riding on past b towards c would take it away from a, so it gets off
+    world.train_direction[train.index] = 1
+    assert train.drop_off_passengers(b, engine.router) == 0
+    assert world.train_load[train.index].sum() == 0 and b.passenger_count == 1
+
+    # At the end of the line the train turns around, so the next stop is b again
+    world.train_target[train.index] = 2
+    assert train.next_stop() is b
@@ -0,0 +1,34 @@
+import pygame
+
+from engine import SimulationEngine
+from main import set_sidebar_positions
+from utils.constants import HEIGHT, SCREEN_WIDTH, SIDEBAR_WIDTH, WIDTH
+from utils.sidebar import Sidebar
+
+
+def test_cached_sidebar_matches_a_fresh_one():
+    pygame.display.init()
+    try:
+        pygame.display.set_mode((SCREEN_WIDTH, HEIGHT))
+        lines = SimulationEngine(seed=1).lines
+        set_sidebar_positions(lines)
+        play_button = pygame.Rect(WIDTH + SIDEBAR_WIDTH // 2 - 25, HEIGHT - 80, 50, 50)
+        restart_button = pygame.Rect(WIDTH + SIDEBAR_WIDTH // 2 - 25, HEIGHT - 150, 50, 50)
+
+        cached, fresh = pygame.Surface((SCREEN_WIDTH, HEIGHT)), pygame.Surface((SCREEN_WIDTH, HEIGHT))
+        sidebar = Sidebar()
+        for second in range(0, 200, 7):
+            lines[second % len(lines)].active = True
+            sidebar.draw(cached, second + 0.5, play_button, restart_button, second % 2 == 0, second // 3, lines)
+            lines[second % len(lines)].active = False
+        lines[0].active = True
+        args = (199.5, play_button, restart_button, True, 66, lines)
+        assert sidebar.draw(cached, *args) is not None
+        assert sidebar.draw(cached, *args) is None  # Nothing changed, nothing drawn
+        Sidebar().draw(fresh, *args)
+
+        area = pygame.Rect(WIDTH, 0, SIDEBAR_WIDTH, HEIGHT)
+        assert (pygame.image.tobytes(cached.subsurface(area), "RGB")
+                == pygame.image.tobytes(fresh.subsurface(area), "RGB"))
+    finally:
+        pygame.display.quit()
@@ -0,0 +1,63 @@
+import random
+
+import numpy as np
+import pytest
+
+from engine import SimulationEngine
+from helpers import random_play
+
+
+def play(engine, ticks, rng):
+    for _ in random_play(engine, ticks, rng, 100):
+        pass
+
+
+def test_restore_then_play_matches_uninterrupted_run():
+    engine = SimulationEngine(seed=11)
+    play(engine, 3000, random.Random(1))
+    snapshot = engine.snapshot()
+    play(engine, 3000, random.Random(2))
+    reference, score = engine.snapshot(), engine.score
+
+    play(engine, 1500, random.Random(3))
+    engine.restore(snapshot)
+    play(engine, 3000, random.Random(2))
+    assert engine.snapshot() == reference and engine.score == score
+
+    fresh = SimulationEngine(seed=11)
+    fresh.restore(snapshot)
+    play(fresh, 3000, random.Random(2))
+    assert fresh.snapshot() == reference
+
+
+def test_restore_across_divergent_branches():
+    engine = SimulationEngine(seed=3)
+    play(engine, 600, random.Random(0))
+    root = engine.snapshot()
+    branches = []
+    for seed in (1, 2):
+        engine.restore(root)
+        engine.rng.seed(seed)  # Different futures spawn different stations under the same indices
+        play(engine, 3000, random.Random(seed))
+        branches.append((engine.snapshot(), engine.world.station_x[:engine.world.station_count].copy()))
+    (first, first_x), (_, second_x) = branches
+    shared = min(len(first_x), len(second_x))
+    assert (first_x[:shared] != second_x[:shared]).any()
+
+    engine.restore(first)
+    for station in engine.stations:
+        assert engine.station_at((station.x, station.y)) is station
+    for line in engine.lines:
+        if len(line.stations) > 1:
+            stops = engine.world.line_stops[line.index, :len(line.stations)]
+            assert np.allclose(line.path()[2], stops)
+
+
+def test_restore_refuses_another_map():
+    engine, other = SimulationEngine(seed=0), SimulationEngine(seed=1)
+    assert engine.map_data["name"] != other.map_data["name"]
+    play(engine, 600, random.Random(0))
+    reference = other.snapshot()
+    with pytest.raises(ValueError):
+        other.restore(engine.snapshot())
+    assert other.snapshot() == reference
@@ -0,0 +1,39 @@
+import math
+import random
+
+from models.stations import Station
+from models.world import WorldState
+from utils.constants import SHAPES
+from utils.spatial_hash import SpatialHash
+
+
+def test_queries_match_linear_scan():
+    rng = random.Random(0)
+    world = WorldState()
+    index = SpatialHash()
+    stations = []
+    for _ in range(200):
+        station = Station(rng.randrange(0, 800, 10), rng.randrange(0, 600, 10), rng.choice(SHAPES), world)
+        index.insert(station)
+        stations.append(station)
+
+    for _ in range(500):
+        pos = (rng.uniform(-50, 850), rng.uniform(-50, 650))
+        distances = [math.dist(pos, (station.x, station.y)) for station in stations]
+
+        within = {station.index for station, d in zip(stations, distances) if d <= 60}
+        assert {station.index for station in index.within(pos, 60)} == within
+
+        hit = index.hit(pos, Station.radius)
+        if hit is None:
+            assert not any(station.contains(pos) for station in stations)
+        else:
+            assert hit.contains(pos)
+
+        nearest = index.nearest(pos)
+        assert math.isclose(math.dist(pos, (nearest.x, nearest.y)), min(distances))
+        snapped = index.nearest(pos, 25)
+        if min(distances) > 25:
+            assert snapped is None
+        else:
+            assert math.isclose(math.dist(pos, (snapped.x, snapped.y)), min(distances))
@@ -0,0 +1,30 @@
+import pygame
+
+from benchmarks.run_benchmarks import build_engine
+from utils.helpers import draw_passengers, draw_station
+from utils.sprites import SpriteAtlas
+
+BACKGROUND = (240, 234, 214)
+
+
+def test_atlas_blits_the_same_pixels_as_drawing():
+    pygame.display.init()
+    try:
+        pygame.display.set_mode((950, 650))
+        engine = build_engine(40, 6)
+        drawn, blitted = pygame.Surface((950, 650)), pygame.Surface((950, 650))
+        drawn.fill(BACKGROUND)
+        blitted.fill(BACKGROUND)
+
+        # The renderer draws every station before any passenger
+        for station in engine.stations:
+            draw_station(drawn, station)
+        for station in engine.stations:
+            draw_passengers(drawn, station.passengers)
+        atlas = SpriteAtlas()
+        atlas.draw_stations(blitted, engine.stations)
+        atlas.draw_passengers(blitted, engine.world)
+
+        assert pygame.image.tobytes(drawn, "RGB") == pygame.image.tobytes(blitted, "RGB")
+    finally:
+        pygame.display.quit()
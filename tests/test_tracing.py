@@ -0,0 +1,43 @@
+import time
+
+import numpy as np
+
+from engine import SimulationEngine
+from utils.tracing import DEBUG, INFO, PASSENGER_DELIVERED, STATION_ADDED, Tracer, read_trace, tracer
+
+
+def test_ring_buffer_writes_events_in_order(tmp_path):
+    path = tmp_path / "events.trace"
+    local = Tracer()
+    local.start(path, INFO, capacity=64, batch=16)
+    for burst in range(5):
+        for i in range(40):
+            local.emit(STATION_ADDED, burst * 40 + i)
+        while local.flushed < local.head:  # Let the writer catch up so the ring wraps without dropping
+            time.sleep(0.001)
+    local.stop()
+
+    header, events = read_trace(path)
+    assert header["level"] == "info" and local.dropped == 0
+    assert events["a"].tolist() == list(range(200))
+    assert (events["kind"] == STATION_ADDED).all()
+
+
+def test_delivered_events_add_up_to_the_score(tmp_path):
+    path = tmp_path / "game.trace"
+    engine = SimulationEngine(seed=9)
+    line = engine.lines[0]
+    engine.connect(engine.stations[0], engine.stations[1], line)
+    engine.connect(engine.stations[1], engine.stations[2], line)
+    tracer.start(path, DEBUG)
+    try:
+        for _ in range(6000):
+            engine.update()
+    finally:
+        tracer.stop()
+        tracer.tick = 0
+
+    _, events = read_trace(path)
+    assert engine.score > 0
+    assert int(np.count_nonzero(events["kind"] == PASSENGER_DELIVERED)) == engine.score
+    assert np.all(np.diff(events["tick"].astype(np.int64)) >= 0)
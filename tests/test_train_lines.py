@@ -0,0 +1,54 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from models.train_lines import TrainLine, calculate_simplified_path, offset_path
+
+
+def reference_path(start, end):
+    """The one-pixel-step octilinear walk the closed form replaced, reduced to its turning points."""
+    (x1, y1), (x2, y2) = start, end
+    path = [start]
+    while (x1, y1) != (x2, y2):
+        if abs(x2 - x1) > abs(y2 - y1):
+            x1 += 1 if x2 > x1 else -1
+        elif abs(y2 - y1) > abs(x2 - x1):
+            y1 += 1 if y2 > y1 else -1
+        else:
+            x1 += 1 if x2 > x1 else -1
+            y1 += 1 if y2 > y1 else -1
+        path.append((x1, y1))
+    # Keep the endpoints and every vertex where the direction changes
+    return [p for i, p in enumerate(path)
+            if i in (0, len(path) - 1)
+            or (p[0] - path[i - 1][0], p[1] - path[i - 1][1]) != (path[i + 1][0] - p[0], path[i + 1][1] - p[1])]
+
+
+def test_closed_form_path_matches_step_walk():
+    rng = random.Random(0)
+    for _ in range(500):
+        start = (rng.randrange(0, 800, 10), rng.randrange(0, 600, 10))
+        end = (rng.randrange(0, 800, 10), rng.randrange(0, 600, 10))
+        assert calculate_simplified_path(start, end) == reference_path(start, end)
+
+
+def test_segment_geometry_cache_matches_fresh_geometry():
+    line = TrainLine((255, 0, 0), index=1)
+    stations = [SimpleNamespace(x=x, y=y) for x, y in ((100, 100), (300, 160), (320, 400), (120, 420))]
+    for a, b in zip(stations, stations[1:]):
+        line.add_connection(a, b)
+        points, _ = line.segment_geometry(a, b, line.index)
+        assert points == offset_path(calculate_simplified_path((a.x, a.y), (b.x, b.y)), line.index)
+        assert line.segment_geometry(a, b, line.index)[0] is points  # Served from the cache
+
+    _, lengths, stops = line.path()
+    assert len(stops) == len(stations)
+    assert stops[0] == 0 and stops[-1] == pytest.approx(lengths[-1])
+    for i, distance in enumerate(stops[:-1]):
+        points, _ = line.segment_geometry(stations[i], stations[i + 1], line.index)
+        assert line.position_at(distance) == pytest.approx(points[0])
+
+    version = line.version
+    line.add_connection(stations[-1], SimpleNamespace(x=500, y=500))
+    assert line.version > version and len(line.path()[2]) == len(stations) + 1
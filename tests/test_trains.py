@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from engine import SimulationEngine
+from utils.constants import TRAIN_SPEED
+
+
+def test_trains_run_back_and_forth_between_end_stops():
+    engine = SimulationEngine(seed=7)
+    a, b, c = engine.stations[:3]
+    line = engine.lines[0]
+    engine.connect(a, b, line)
+    engine.connect(b, c, line)
+    stops = engine.world.line_stops[line.index, :3]
+    train = line.trains[0]
+
+    visited = []
+    previous = train.distance
+    for _ in range(6000):
+        engine.update()
+        distance = train.distance
+        assert abs(distance - previous) <= TRAIN_SPEED * engine.tick + 1e-9
+        assert 0.0 <= distance <= stops[-1]
+        at = np.flatnonzero(stops == distance)
+        if len(at) and (not visited or visited[-1] != at[0]):
+            visited.append(int(at[0]))
+        previous = distance
+    assert visited[:8] == [1, 2, 1, 0, 1, 2, 1, 0]
+    assert train.position == pytest.approx(line.position_at(train.distance))
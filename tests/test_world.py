@@ -0,0 +1,47 @@
+import numpy as np
+
+from models.stations import Station
+from models.world import STATION_ARRAYS, TRAIN_ARRAYS, WorldState
+from utils.constants import SHAPES
+from utils.snapshot import SnapshotReader, SnapshotWriter
+
+
+def filled_world():
+    """A world grown past its initial capacity, with passengers at every station."""
+    world = WorldState(station_capacity=2, train_capacity=1, line_count=2)
+    for index in range(9):
+        world.add_station(10 * index, 20 * index, index % len(SHAPES))
+        for passenger in range(index):
+            world.push_passenger(index, passenger % len(SHAPES))
+        world.spawn_timer[index] = 0.5 * index
+    for line in (0, 1, 1):
+        world.add_train(line)
+    world.train_distance[:3] = (1.5, 2.5, 3.5)
+    world.train_load[1, 2] = 4
+    world.set_line_stops(1, [0.0, 12.0, 30.0])
+    return world
+
+
+def test_growth_keeps_rows_and_views_read_them():
+    world = filled_world()
+    assert world.station_count == 9 and world.train_count == 3
+    station = Station.view(world, 7)
+    assert (station.x, station.y, station.shape) == (70, 140, SHAPES[1])
+    assert station.passenger_count == 7
+    assert [passenger.shape_id for passenger in station.passengers] == sorted(i % len(SHAPES) for i in range(7))
+    assert world.train_distance[:3].tolist() == [1.5, 2.5, 3.5]
+
+
+def test_state_round_trip():
+    world = filled_world()
+    writer = SnapshotWriter()
+    world.write_state(writer)
+    copy = WorldState(line_count=2)  # Line count is fixed by the game, unlike station and train rows
+    copy.read_state(SnapshotReader(writer.getvalue()))
+
+    assert (copy.station_count, copy.train_count) == (world.station_count, world.train_count)
+    for name in STATION_ARRAYS:
+        assert np.array_equal(getattr(copy, name)[:copy.station_count], getattr(world, name)[:world.station_count])
+    for name in TRAIN_ARRAYS:
+        assert np.array_equal(getattr(copy, name)[:copy.train_count], getattr(world, name)[:world.train_count])
+    assert np.array_equal(copy.line_stops, world.line_stops)
@@ -0,0 +1,167 @@
+import argparse
+import os
+import time
+
+import ai  # noqa: F401  Puts src/ on the import path
+import torch
+
+from ai.agent import PolicyNetwork
+from ai.environment import VectorMiniMetroEnv
+from ai.utils import RESET, SharedArrays, process_context, rollout_buffer_specs, rollout_worker
+
+
+class RolloutWorkers:
+    """
+    Worker processes that each step a VectorMiniMetroEnv over their own slice
+    of the shared rollout buffers. Only step indices and timings cross the
+    pipes; observations, actions, rewards and dones stay in shared memory.
+    """
+
+    def __init__(self, workers, envs_per_worker, rollout_steps, seed, env_kwargs):
+        self.num_envs = workers * envs_per_worker
+        probe = VectorMiniMetroEnv(1, **env_kwargs)
+        self.max_stations, self.num_lines = probe.max_stations, probe.num_lines
+        self.action_count = probe.noop_action + 1
+        probe.close()
+        self.buffers = SharedArrays(rollout_buffer_specs(self.num_envs, rollout_steps, self.max_stations, self.num_lines))
+
+        # Start workers before the learner touches torch, so no thread pools are copied into forked workers
+        context = process_context()
+        self.connections = []
+        self.processes = []
+        for index in range(workers):
+            envs = slice(index * envs_per_worker, (index + 1) * envs_per_worker)
+            parent, child = context.Pipe()
+            process = context.Process(target=rollout_worker, daemon=True,
+                                      args=(child, self.buffers.handle, envs, env_kwargs, seed + index))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self.busy_time = 0.0  # Seconds the workers spent stepping, summed over workers
+        self.wait_time = 0.0  # Seconds the learner spent waiting on them
+
+    def run(self, command):
+        """Send command to every worker and wait for them all to finish it."""
+        start = time.perf_counter()
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            self.busy_time += connection.recv()
+        self.wait_time += time.perf_counter() - start
+
+    def close(self):
+        for connection in self.connections:
+            connection.send(None)
+        for process in self.processes:
+            process.join()
+        self.buffers.close()
+        self.buffers.unlink()
+
+
+def observations(buffers, step):
+    """The observation batch and action mask at rollout slot step, as tensors sharing the buffer memory."""
+    return tuple(torch.from_numpy(array[step]) for array in (buffers.stations, buffers.lines, buffers.action_mask))
+
+
+@torch.no_grad()
+def collect(workers, policy, rollout_steps):
+    """Step every environment rollout_steps times, sampling actions in one batch per step."""
+    buffers = workers.buffers
+    for step in range(rollout_steps):
+        actions, _, _, _ = policy(*observations(buffers, step))
+        buffers.actions[step] = actions.numpy()
+        workers.run(step)
+
+
+def update(workers, policy, optimizer, gamma, value_coef, entropy_coef):
+    """
+    One advantage actor-critic step on the rollout just collected.
+    The rollout is re-evaluated as one batch here rather than keeping a graph per step during collection.
+    """
+    buffers = workers.buffers
+    steps, num_envs = buffers.actions.shape
+    batch = [tensor.flatten(0, 1) for tensor in observations(buffers, slice(0, steps))]
+    actions = torch.from_numpy(buffers.actions)
+    _, log_probs, entropies, values = policy(*batch, actions.flatten())
+    log_probs, values = log_probs.view(steps, num_envs), values.view(steps, num_envs)
+    with torch.no_grad():
+        returns = policy(*observations(buffers, steps))[3]
+
+    rewards = torch.from_numpy(buffers.rewards)
+    not_done = 1.0 - torch.from_numpy(buffers.dones).float()
+    targets = torch.empty_like(values)
+    for step in reversed(range(len(rewards))):
+        returns = rewards[step] + gamma * not_done[step] * returns
+        targets[step] = returns
+    advantages = targets - values
+
+    policy_loss = -(log_probs * advantages.detach()).mean()
+    value_loss = advantages.pow(2).mean()
+    entropy = entropies.mean()
+    loss = policy_loss + value_coef * value_loss - entropy_coef * entropy
+    optimizer.zero_grad()
+    loss.backward()
+    torch.nn.utils.clip_grad_norm_(policy.parameters(), 0.5)
+    optimizer.step()
+
+    # The last observation starts the next rollout
+    buffers.stations[0] = buffers.stations[-1]
+    buffers.lines[0] = buffers.lines[-1]
+    buffers.action_mask[0] = buffers.action_mask[-1]
+    return policy_loss.item(), value_loss.item(), entropy.item()
+
+
+def train(workers=None, envs_per_worker=32, rollout_steps=32, updates=100, lr=3e-4, gamma=0.99, value_coef=0.5,
+          entropy_coef=0.01, seed=0, threads=1, save_path=None, env_kwargs=None):
+    """Train a PolicyNetwork with A2C on rollouts collected by worker processes."""
+    workers = workers or os.cpu_count()
+    pool = RolloutWorkers(workers, envs_per_worker, rollout_steps, seed, env_kwargs or {})
+    try:
+        torch.manual_seed(seed)
+        torch.set_num_threads(threads)
+        policy = PolicyNetwork(pool.num_lines)
+        optimizer = torch.optim.Adam(policy.parameters(), lr=lr)
+        pool.run(RESET)
+
+        start = time.perf_counter()
+        pool.busy_time = pool.wait_time = 0.0
+        steps = 0
+        for index in range(1, updates + 1):
+            collect(pool, policy, rollout_steps)
+            losses = update(pool, policy, optimizer, gamma, value_coef, entropy_coef)
+            steps += rollout_steps * pool.num_envs
+
+            elapsed = time.perf_counter() - start
+            learner_time = elapsed - pool.wait_time  # Inference and updates, not waiting on the workers
+            reward = pool.buffers.rewards.sum() / pool.num_envs
+            print(f"update {index}/{updates}: {steps / elapsed:.0f} env steps/s, "
+                  f"learner {learner_time / elapsed:.0%}, workers {pool.busy_time / (workers * elapsed):.0%} busy, "
+                  f"reward/env {reward:.2f}, policy {losses[0]:.3f}, value {losses[1]:.3f}, entropy {losses[2]:.3f}")
+    finally:
+        pool.close()
+
+    if save_path:
+        torch.save(policy.state_dict(), save_path)
+        print(f"Saved policy to {save_path}")
+    return policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a MiniMetro policy on rollouts from worker processes.")
+    parser.add_argument("--workers", type=int, help="Rollout worker processes, one per core by default")
+    parser.add_argument("--envs-per-worker", type=int, default=32, help="Environments each worker steps in lockstep")
+    parser.add_argument("--rollout-steps", type=int, default=32, help="Steps per environment between updates")
+    parser.add_argument("--updates", type=int, default=100, help="Learner updates to run")
+    parser.add_argument("--lr", type=float, default=3e-4, help="Adam learning rate")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the policy and the environments")
+    parser.add_argument("--threads", type=int, default=1, help="Torch threads for the learner")
+    parser.add_argument("--save", help="Write the trained policy's state_dict to this file")
+    args = parser.parse_args()
+
+    train(args.workers, args.envs_per_worker, args.rollout_steps, args.updates, args.lr, seed=args.seed,
+          threads=args.threads, save_path=args.save)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import threading
+
+import ai  # noqa: F401  Puts src/ on the import path
+from ai.agent import LookaheadPlanner
+
+import pygame
+from engine import SimulationEngine
+from main import SPEED_KEYS, set_sidebar_positions
+from renderer import Renderer
+from utils.clock import SimulationClock
+from utils.constants import HEIGHT, SCREEN_WIDTH, SIDEBAR_WIDTH, TIME_SCALES, WIDTH
+from utils.session import parse_seed
+from utils.sidebar import handle_sidebar_events
+
+
+class PlannerThread:
+    """
+    Runs one planner search at a time off the main thread, so the viewer keeps
+    drawing while the workers think. The move is applied once the search is done,
+    unless the game was restarted in the meantime.
+    """
+
+    def __init__(self, planner):
+        self.planner = planner
+        self.thread = None
+        self.result = None
+
+    @property
+    def busy(self):
+        return self.thread is not None
+
+    def start(self, engine):
+        # Snapshot and candidates come from the main thread; the search only needs the bytes
+        snapshot, seed, moves = engine.snapshot(), engine.session.seed, self.planner.candidates(engine)
+        generation = engine.generation
+
+        def search():
+            self.result = (generation,) + self.planner.search(snapshot, seed, moves)
+
+        self.thread = threading.Thread(target=search, daemon=True)
+        self.thread.start()
+
+    def poll(self):
+        """The finished search as (generation, move, report), or None while it is still running."""
+        if self.thread is None or self.thread.is_alive():
+            return None
+        self.thread = None
+        result, self.result = self.result, None
+        return result
+
+
+def main(seed=None, workers=None, budget=0.5, horizon=30.0, interval=5.0, speed=0):
+    # The worker pool is forked before pygame opens a display
+    planner = LookaheadPlanner(workers, budget, horizon, seed=seed)
+    thinker = PlannerThread(planner)
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, HEIGHT))
+    pygame.display.set_caption("MiniMetro Planner")
+
+    engine = SimulationEngine(seed=seed)
+    print(f"Session seed: {engine.session.seed}")
+    set_sidebar_positions(engine.lines)
+    renderer = Renderer(screen)
+    clock = SimulationClock(engine, speed)
+
+    running = True
+    next_decision = 0.0  # Game time of the next search
+    play_button = pygame.Rect(WIDTH + (SIDEBAR_WIDTH // 2) - 25, HEIGHT - 80, 50, 50)
+    restart_button = pygame.Rect(WIDTH + (SIDEBAR_WIDTH // 2) - 25, HEIGHT - 150, 50, 50)
+
+    while True:
+        frame_time = renderer.tick()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                print(f"{planner.rollouts} rollouts at {planner.rollouts / max(planner.search_time, 1e-9):.0f} "
+                      f"rollouts/s, score {engine.score}")
+                planner.close()
+                pygame.quit()
+                return
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                clock.cycle_scale()
+            if event.type == pygame.KEYDOWN and event.key in SPEED_KEYS[:len(TIME_SCALES)]:
+                clock.set_scale(SPEED_KEYS.index(event.key))
+            running, restart_pressed = handle_sidebar_events(event, play_button, restart_button, running)
+            if restart_pressed:
+                engine.reset()
+                print(f"Session seed: {engine.session.seed}")
+                set_sidebar_positions(engine.lines)
+                next_decision = 0.0
+
+        result = thinker.poll()
+        if result:
+            generation, move, report = result
+            if generation == engine.generation and move is not None:
+                line, a, b = move
+                engine.select_line(engine.lines[line])
+                engine.connect(engine.stations[a], engine.stations[b])
+            print(f"t={engine.elapsed_time:.0f}s move {move}: {report['rollouts']} rollouts over "
+                  f"{report['options']} options, {report['rollouts_per_second']:.0f} rollouts/s, value {report['value']:.1f}")
+
+        if running:
+            if not thinker.busy and engine.elapsed_time >= next_decision:
+                thinker.start(engine)
+                next_decision = engine.elapsed_time + interval
+            clock.advance(frame_time)
+
+        if not running or clock.should_render():
+            renderer.draw(engine, running, play_button, restart_button, speed_label=clock.label)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch the lookahead planner play MiniMetro.")
+    parser.add_argument("--seed", type=parse_seed, help="Session seed, random by default")
+    parser.add_argument("--workers", type=int, help="Rollout processes, one per core by default")
+    parser.add_argument("--budget", type=float, default=0.5, help="Wall seconds of search per decision")
+    parser.add_argument("--horizon", type=float, default=30.0, help="Game seconds simulated per rollout")
+    parser.add_argument("--interval", type=float, default=5.0, help="Game seconds between decisions")
+    parser.add_argument("--speed", choices=["1", "4", "16", "max"], default="1", help="Initial time scale")
+    args = parser.parse_args()
+    speed = TIME_SCALES.index(None if args.speed == "max" else int(args.speed))
+    main(args.seed, args.workers, args.budget, args.horizon, args.interval, speed)